@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from cache import load_clean_cached, data_version
+from memo import set_version
+from transform import LongView
+from vocabulary import vocabulary_of
+from validate_json import validate_many
+from filter_by_country import filter_by_country
+from filter_by_indicator import filter_by_indicator
+from process import aggregate_table, table_frame, country_frames
+
+
+# ---------- CONFIGS ----------
+
+def parse_config(name: str, text: str) -> tuple:
+    """(name, config, errors); a config that is not valid JSON is None, with errors saying why."""
+    try:
+        return name, json.loads(text), []
+    except json.JSONDecodeError as error:
+        return name, None, [f"Invalid JSON: {error}"]
+
+
+def read_configs(path: str) -> list:
+    """
+    (name, config, errors) triples from a directory of .json files (named
+    after the file, in sorted order) or a JSON-lines file (named by line
+    number). One malformed config does not stop the others.
+    """
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.endswith(".json"))
+
+        def read(name):
+            with open(os.path.join(path, name)) as file:
+                return parse_config(os.path.splitext(name)[0], file.read())
+
+        return list(map(read, names))
+
+    with open(path) as file:
+        lines = [line for line in file if line.strip()]
+    return [parse_config(f"config-{i:05d}", line) for i, line in enumerate(lines, start=1)]
+
+
+# ---------- OUTPUTS ----------
+
+def write_results(folder: str, region_results: dict, country_data: dict):
+    """Per-year continent aggregates and per-country yearly aggregates as CSV."""
+    regions = pd.concat(
+        [frame.assign(Year=year)[["Year", "Continent", "GDP"]] for year, frame in region_results.items()],
+        ignore_index=True
+    )
+    countries = pd.concat(
+        [frame.assign(**{"Country Name": country})[["Country Name", "Year", "GDP"]] for country, frame in country_data.items()],
+        ignore_index=True
+    )
+    regions.to_csv(os.path.join(folder, "regions.csv"), index=False)
+    countries.to_csv(os.path.join(folder, "countries.csv"), index=False)
+
+
+# ---------- RUNNER ----------
+
+def run_batch(data_file: str, config_path: str, out_dir: str, charts: bool = True, workers: int = None,
+              chart_formats=("png",), render_workers: int = None) -> dict:
+    """
+    Runs every config in config_path against one load of data_file.
+
+    The dataset is loaded, cleaned and indexed once; each config then only
+    validates, aggregates and renders. Each config gets out_dir/<name>/
+    with regions.csv, countries.csv and, with charts, its terminal report
+    (report.txt) and headless chart files; a config that is malformed JSON
+    or invalid gets errors.txt instead. With
+    render_workers, charts of every config are drawn by one shared pool.
+    Returns the stage timings and counts printed in the throughput summary.
+    """
+    timings = defaultdict(float)
+    started = time.perf_counter()
+
+    def timed(stage, func, *args, **kwargs):
+        stage_started = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[stage] += time.perf_counter() - stage_started
+        return result
+
+    # ---------- SHARED STATE (once) ----------
+    cleaned_df, _ = timed("load+clean", load_clean_cached, data_file, workers=workers)
+    set_version(cleaned_df, data_version(data_file), source=data_file)
+    df_long = timed("transform", LongView, cleaned_df)
+    vocabulary = timed("transform", vocabulary_of, cleaned_df)
+
+    configs = read_configs(config_path)
+    readable = [config for _, config, errors in configs if not errors]
+    validated = iter(timed("validate", validate_many, readable, vocabulary=vocabulary))
+    results = [(None, errors) if errors else next(validated) for _, _, errors in configs]
+
+    # ---------- PER CONFIG ----------
+    if charts:
+        # Plotting stack, only loaded when charts are drawn
+        from render import set_headless, set_interactive, set_render_workers, close_render_pool
+        from visualize_regions import visualize_regions
+        from visualize_countries import visualize_countries
+        set_render_workers(render_workers)
+    failed = 0
+    try:
+        for (name, _, _), (validated_config, json_errors) in zip(configs, results):
+            folder = os.path.join(out_dir, name)
+            os.makedirs(folder, exist_ok=True)
+
+            if json_errors:
+                failed += 1
+                with open(os.path.join(folder, "errors.txt"), "w") as file:
+                    file.write("\n".join(json_errors) + "\n")
+                continue
+
+            years, operation = validated_config["year"], validated_config["operation"]
+
+            def aggregate():
+                indicator_long = filter_by_indicator(df_long, validated_config)
+                table = aggregate_table(indicator_long, years, [operation])
+                region_results = {year: table_frame(table, operation, year) for year in years}
+                country_data = country_frames(
+                    filter_by_country(indicator_long, validated_config), validated_config["country"], operation
+                )
+                return region_results, country_data
+
+            region_results, country_data = timed("process", aggregate)
+            timed("write", write_results, folder, region_results, country_data)
+
+            if charts:
+                set_headless(folder, chart_formats)
+                with open(os.path.join(folder, "report.txt"), "w") as report, redirect_stdout(report):
+                    timed("render", visualize_regions, None, validated_config, region_results)
+                    timed("render", visualize_countries, None, validated_config, country_data)
+    finally:
+        # Queued charts are waited for and the workers stopped even when a config fails
+        if charts:
+            timed("render", close_render_pool)
+            set_interactive()
+
+    total = time.perf_counter() - started
+    summary = {"configs": len(configs), "failed": failed, "seconds": total, "stages": dict(timings)}
+    print_summary(summary)
+    return summary
+
+
+def print_summary(summary: dict):
+    print("\n" + "="*60)
+    print("BATCH THROUGHPUT".center(60))
+    print("="*60)
+    print(f"  {'configs':<14} {summary['configs']:>10,}   ({summary['failed']:,} invalid)")
+    print(f"  {'total':<14} {summary['seconds']:>10.2f} s   "
+          f"{summary['configs'] / summary['seconds'] if summary['seconds'] else 0:,.1f} configs/s")
+    list(map(
+        lambda item: print(f"  {item[0]:<14} {item[1]:>10.2f} s   {item[1] / summary['seconds'] * 100 if summary['seconds'] else 0:5.1f}%"),
+        summary["stages"].items()
+    ))
+    print("="*60 + "\n")
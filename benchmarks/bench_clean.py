@@ -0,0 +1,93 @@
+"""
+Benchmark: clean_data vs. clean_data at a git revision (by default the original check-by-check version).
+
+Run from the project root:
+    python -m benchmarks.bench_clean --rows 1000000
+    python -m benchmarks.bench_clean --rows 1000000 --baseline HEAD
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+import types
+
+import pandas as pd
+
+from benchmarks.generate import ERROR_TYPES, generate_csv
+from cleaner import clean_data, TEXT_COLS
+
+# Share of rows carrying each error type in generated data
+ERROR_RATE = 0.01
+
+
+# ---------- BASELINE (from git) ----------
+
+def first_commit() -> str:
+    return git("rev-list", "--max-parents=0", "HEAD").split()[0]
+
+
+def git(*args) -> str:
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout
+
+
+def baseline_clean_data(rev: str):
+    """
+    clean_data as committed at a git revision, compiled from
+    `git show rev:cleaner.py` so no copy of an old version lives in the tree.
+    """
+    path = f"{rev}:cleaner.py"
+    module = types.ModuleType("baseline_cleaner")
+    module.__file__ = path
+    exec(compile(git("show", path), path, "exec"), module.__dict__)
+    return module.clean_data
+
+
+# ---------- TIMING ----------
+
+def best_time(func, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", metavar="REV", default=None,
+                        help="git revision whose cleaner.py is the baseline (default: the first commit)")
+    args = parser.parse_args()
+    baseline_rev = args.baseline or first_commit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_gdp.csv")
+        # One indicator: each generated entity is one row
+        generate_csv(path, args.rows, rates=dict.fromkeys(ERROR_TYPES, ERROR_RATE))
+        df = pd.read_csv(path)
+
+    legacy_time, (legacy_df, legacy_log) = best_time(baseline_clean_data(baseline_rev), df, args.repeat)
+    new_time, (new_df, new_log) = best_time(clean_data, df, args.repeat)
+
+    # Text columns became categorical on purpose: cast them explicitly and
+    # keep every other column (and the text values) strictly equal
+    def as_text(df):
+        return df.astype({col: "string" for col in TEXT_COLS})
+
+    pd.testing.assert_frame_equal(as_text(legacy_df), as_text(new_df), check_exact=True)
+    assert {k: list(v) for k, v in legacy_log.items()} == {k: list(v) for k, v in new_log.items()}, "error logs differ"
+
+    print(f"rows: {len(df):,}  kept: {len(new_df):,}")
+    print(f"{'clean_data @ ' + baseline_rev[:10]:<24} {legacy_time:8.3f} s")
+    print(f"{'clean_data (this tree)':<24} {new_time:8.3f} s")
+    print(f"{'speedup':<24} {legacy_time / new_time:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
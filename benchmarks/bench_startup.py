@@ -0,0 +1,94 @@
+"""
+Benchmark: cold-start time of main.py for the validate-only, compute-only and full-dashboard paths.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --repeat 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Packages whose import cost is reported separately
+PACKAGES = ["numpy", "pandas", "matplotlib", "seaborn"]
+
+
+# ---------- PATHS ----------
+
+def paths(chart_dir: str) -> dict:
+    # The dashboard renders headless so the run ends without a window
+    return {
+        "validate-only": ["--validate-only"],
+        "compute-only": ["--no-charts"],
+        "full-dashboard": ["--headless", chart_dir],
+    }
+
+
+# ---------- MEASUREMENT ----------
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Total import time (sum of top-level imports) and the cumulative time
+    of each package in PACKAGES, in seconds, from -X importtime output.
+    """
+    total = 0
+    packages = dict.fromkeys(PACKAGES, 0)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = int(cumulative)
+        # Top-level imports have a single space before the module name
+        if not name.startswith("  "):
+            total += cumulative
+        name = name.strip()
+        if name in packages:
+            packages[name] = max(packages[name], cumulative)
+    return {"imports": total / 1e6, **{name: us / 1e6 for name, us in packages.items()}}
+
+
+def run_once(args: list) -> dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        env=dict(os.environ, MPLBACKEND="Agg")
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode:
+        raise RuntimeError(f"main.py {' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+    return {"wall": wall, **parse_importtime(completed.stderr)}
+
+
+def best_run(args: list, repeat: int) -> dict:
+    runs = [run_once(args) for _ in range(repeat)]
+    return min(runs, key=lambda run: run["wall"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", default=None,
+                        help="also write the results here, to track them across changes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chart_dir:
+        results = {name: best_run(flags, args.repeat) for name, flags in paths(chart_dir).items()}
+
+    print(f"{'path':<16} {'wall':>8} {'imports':>8}" + "".join(f" {name:>11}" for name in PACKAGES))
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result['wall']:7.3f}s {result['imports']:7.3f}s"
+            + "".join(f" {result[package]:10.3f}s" for package in PACKAGES)
+        )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark suite: every pipeline stage and the end-to-end headless run across data scales.
+
+Run from the project root:
+    python -m benchmarks.bench_suite --scales tiny,small --save baseline.json
+    python -m benchmarks.bench_suite --scales tiny,small --baseline baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import ERROR_TYPES, generate_csv
+from load_data import load_data
+from cleaner import clean_data
+from memo import RESULTS
+from vocabulary import vocabulary_of
+from validate_json import validate_json
+from transform import LongView, transform_to_long
+from filter_by_country import filter_by_country
+from filter_by_indicator import filter_by_indicator
+from process import aggregate_table, country_frames
+
+# name -> (entities, year columns, indicators)
+SCALES = {
+    "tiny": (1_000, 65, 1),
+    "small": (10_000, 65, 1),
+    "medium": (100_000, 65, 2),
+    "wide": (10_000, 300, 4),
+    "large": (1_000_000, 65, 1),
+    "huge": (1_000_000, 300, 4),
+}
+
+# Share of rows carrying each error type in generated data
+ERROR_RATE = 0.01
+
+STAGES = ["load", "clean", "validate", "transform", "filter", "process", "end_to_end"]
+
+
+# ---------- DATA ----------
+
+def scale_csv(name: str, data_dir: str) -> str:
+    """Generated CSV of a scale, reused while it exists in data_dir."""
+    entities, years, indicators = SCALES[name]
+    path = os.path.join(data_dir, f"synthetic_{name}_{entities}x{years}x{indicators}.csv")
+    if not os.path.exists(path):
+        generate_csv(path, entities, years, indicators, dict.fromkeys(ERROR_TYPES, ERROR_RATE))
+    return path
+
+
+def bench_config(cleaned_df: pd.DataFrame) -> dict:
+    """A dashboard config that is valid for the generated data, over its first indicator."""
+    years = [int(col) for col in cleaned_df.columns if col.isdigit() and int(col) <= 2024]
+    return {
+        "operation": "sum",
+        "output": "dashboard",
+        "country": list(pd.unique(cleaned_df["Country Name"].astype(str)))[:3],
+        "region": ["Asia", "Europe"],
+        "year": [years[0], years[len(years) // 2], years[-1]],
+        "indicator": [str(cleaned_df["Indicator Code"].iloc[0])],
+    }
+
+
+# ---------- STAGES ----------
+
+def run_stages(path: str, chart_dir: str = None) -> dict:
+    """Seconds per stage for one pass; with chart_dir, the end-to-end pass also renders."""
+    # Memoized results would turn later passes into cache reads
+    RESULTS.invalidate()
+    times = {}
+
+    def timed(stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        times[stage] = time.perf_counter() - started
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = timed("load", load_data, path)
+        cleaned_df, _ = timed("clean", clean_data, df)
+        config = bench_config(cleaned_df)
+        validated, errors = timed("validate", lambda: validate_json(config, vocabulary=vocabulary_of(cleaned_df)))
+        if errors:
+            raise RuntimeError(f"benchmark config invalid: {errors}")
+        timed("transform", transform_to_long, cleaned_df)
+        df_long = filter_by_indicator(LongView(cleaned_df), validated)
+        filtered = timed("filter", filter_by_country, df_long, validated)
+        timed("process", lambda: (
+            aggregate_table(df_long, validated["year"], [validated["operation"]]),
+            country_frames(filtered, validated["country"], validated["operation"])
+        ))
+
+    if chart_dir is not None:
+        RESULTS.invalidate()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            end_to_end(path, chart_dir)
+        times["end_to_end"] = time.perf_counter() - started
+    return times
+
+
+def end_to_end(path: str, chart_dir: str):
+    """The headless dashboard from CSV to chart files."""
+    from render import set_headless, set_interactive
+    from visualize_regions import visualize_regions
+    from visualize_countries import visualize_countries
+
+    cleaned_df, _ = clean_data(load_data(path))
+    validated, _ = validate_json(bench_config(cleaned_df), cleaned_df)
+    df_long = filter_by_indicator(LongView(cleaned_df), validated)
+    set_headless(chart_dir)
+    try:
+        visualize_regions(df_long, validated)
+        visualize_countries(filter_by_country(df_long, validated), validated)
+    finally:
+        set_interactive()
+
+
+def bench_scale(name: str, data_dir: str, repeat: int, charts: bool) -> dict:
+    path = scale_csv(name, data_dir)
+    with tempfile.TemporaryDirectory() as chart_dir:
+        runs = [run_stages(path, chart_dir if charts else None) for _ in range(repeat)]
+    # Best of the repeats per stage
+    return {stage: min(run[stage] for run in runs) for stage in runs[0]}
+
+
+# ---------- BASELINE ----------
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """(scale, stage, baseline s, current s) for every stage slower than the baseline allows."""
+    return [
+        (scale, stage, baseline[scale][stage], seconds)
+        for scale, stages in results.items() if scale in baseline
+        for stage, seconds in stages.items() if stage in baseline[scale]
+        if seconds > baseline[scale][stage] * (1 + tolerance) and seconds - baseline[scale][stage] > min_delta
+    ]
+
+
+def print_table(results: dict, baseline: dict = None):
+    stages = [stage for stage in STAGES if any(stage in times for times in results.values())]
+    print(f"{'scale':<8}" + "".join(f" {stage:>11}" for stage in stages))
+    for scale, times in results.items():
+        print(f"{scale:<8}" + "".join(f" {times[stage]:10.3f}s" if stage in times else f" {'-':>11}" for stage in stages))
+        if baseline and scale in baseline:
+            ratios = [times[stage] / baseline[scale][stage] if baseline[scale].get(stage) else np.nan for stage in stages]
+            print(f"{'  vs base':<8}" + "".join(f" {ratio:10.2f}x" for ratio in ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="tiny,small",
+                        help=f"comma-separated scales ({', '.join(SCALES)})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-charts", action="store_true", help="skip the end-to-end headless run")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "gdp_bench"),
+                        help="where generated CSVs are kept between runs")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="flag stages slower than this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a stage counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    scales = args.scales.split(",")
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {unknown}")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {scale: bench_scale(scale, args.data_dir, args.repeat, not args.no_charts) for scale in scales}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    print_table(results, baseline)
+
+    if args.save:
+        meta = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                "machine": platform.machine(), "scales": {scale: SCALES[scale] for scale in scales}}
+        with open(args.save, "w") as file:
+            json.dump({"meta": meta, "results": results}, file, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for scale, stage, before, after in regressions:
+            print(f"REGRESSION {scale}/{stage}: {before:.3f}s -> {after:.3f}s ({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Synthetic GDP CSV generator, statistically similar to the real WDI export, at any scale.
+
+Run from the project root:
+    python -m benchmarks.generate out.csv --entities 1000000 --years 300 --indicators 4 \
+        --error-rate 0.01 --rate empty_gdp=0.05
+"""
+import argparse
+import string
+
+import numpy as np
+import pandas as pd
+
+from cleaner import VALID_CONTINENTS
+
+SOURCE_FILE = "gdp_with_continent_filled.csv"
+FIRST_YEAR = 1960
+
+# Kinds of bad rows clean_data detects, each injected at its own rate
+ERROR_TYPES = ["duplicate", "text_errors", "empty_country", "corrected_gdp", "empty_gdp", "invalid_continent"]
+
+# Indicator every config can use; further indicators are synthetic
+BASE_INDICATOR = ("GDP (current US$)", "NY.GDP.MKTP.CD")
+
+
+# ---------- PROFILE ----------
+
+def fit_profile(source_path: str = SOURCE_FILE) -> dict:
+    """
+    Distributions of the real CSV the generator samples from: continent
+    shares, first reported year, log GDP level in that year and yearly
+    log growth.
+    """
+    source = pd.read_csv(source_path)
+    year_cols = [col for col in source.columns if col.isdigit()]
+    gdp = np.array(source[year_cols].apply(pd.to_numeric, errors="coerce"), dtype=float)
+    gdp[gdp <= 0] = np.nan
+
+    reported = ~np.isnan(gdp)
+    has_data = reported.any(axis=1)
+    first = reported[has_data].argmax(axis=1)
+    levels = np.log(gdp[has_data][np.arange(has_data.sum()), first])
+    growth = np.diff(np.log(gdp), axis=1)
+    growth = growth[~np.isnan(growth)]
+
+    continents = source["Continent"].value_counts(normalize=True)
+    continents = continents[continents.index.isin(VALID_CONTINENTS)]
+    return {
+        "continents": list(continents.index),
+        "continent_shares": (continents / continents.sum()).to_numpy(),
+        "first_year_offsets": first,
+        "level_mean": levels.mean(), "level_std": levels.std(),
+        "growth_mean": growth.mean(), "growth_std": growth.std()
+    }
+
+
+# ---------- NAMES ----------
+
+def letters(numbers: np.ndarray, width: int) -> np.ndarray:
+    """Each number spelled in base 26 with letters only (digits would be text errors)."""
+    alphabet = np.array(list(string.ascii_uppercase))
+    digits = [(numbers // 26 ** power) % 26 for power in reversed(range(width))]
+    return np.array(["".join(chars) for chars in zip(*(alphabet[d] for d in digits))]) if len(numbers) else np.array([], dtype=str)
+
+
+def name_width(count: int) -> int:
+    return max(3, int(np.ceil(np.log(max(count, 2)) / np.log(26))))
+
+
+# ---------- GENERATION ----------
+
+def generate_frame(profile: dict, first_entity: int, n_entities: int, total_entities: int,
+                   years: int, indicators: int, rates: dict, rng) -> pd.DataFrame:
+    """Rows of entities first_entity .. first_entity + n_entities, one per indicator, with errors injected."""
+    width = name_width(total_entities)
+    entity_ids = np.arange(first_entity, first_entity + n_entities)
+    codes = letters(entity_ids, width)
+    names = np.char.add("Land ", np.char.capitalize(np.char.lower(codes)))
+    continents = rng.choice(profile["continents"], n_entities, p=profile["continent_shares"])
+
+    indicator_names = [BASE_INDICATOR[0]] + [f"Synthetic indicator {name}" for name in letters(np.arange(1, indicators), 2)]
+    indicator_codes = [BASE_INDICATOR[1]] + [f"SYN.{name}" for name in letters(np.arange(1, indicators), 2)]
+
+    n_rows = n_entities * indicators
+    entity = np.repeat(np.arange(n_entities), indicators)
+    indicator = np.tile(np.arange(indicators), n_entities)
+
+    # Random walk in log GDP from each row's first reported year on
+    level = rng.normal(profile["level_mean"], profile["level_std"], n_rows)
+    growth = rng.normal(profile["growth_mean"], profile["growth_std"], (n_rows, years))
+    growth[:, 0] = 0.0
+    gdp = np.exp(level[:, None] + np.cumsum(growth, axis=1))
+    first = rng.choice(profile["first_year_offsets"], n_rows)
+    gdp[np.arange(years)[None, :] < first[:, None]] = np.nan
+
+    year_cols = [str(FIRST_YEAR + i) for i in range(years)]
+    df = pd.DataFrame({
+        "Country Name": names[entity],
+        "Country Code": codes[entity],
+        "Indicator Name": np.array(indicator_names)[indicator],
+        "Indicator Code": np.array(indicator_codes)[indicator],
+        "Continent": continents[entity],
+    })
+    df = pd.concat([df, pd.DataFrame(gdp, columns=year_cols)], axis=1)
+    return inject_errors(df, year_cols, rates, rng)
+
+
+def inject_errors(df: pd.DataFrame, year_cols: list, rates: dict, rng) -> pd.DataFrame:
+    n_rows = len(df)
+
+    def pick(error_type):
+        return rng.choice(n_rows, int(round(n_rows * rates.get(error_type, 0.0))), replace=False)
+
+    df.loc[pick("text_errors"), "Country Name"] += "7"
+    df.loc[pick("empty_country"), "Country Name"] = " "
+    df.loc[pick("invalid_continent"), "Continent"] = "Atlantis"
+    df.loc[pick("empty_gdp"), year_cols] = 0.0
+
+    rows = pick("corrected_gdp")
+    if len(rows):
+        col = year_cols[-1]
+        df[col] = df[col].astype(object)
+        df.loc[rows, col] = "unknown"  # read_csv would turn "n/a" into a plain missing value
+
+    duplicates = pick("duplicate")
+    return pd.concat([df, df.iloc[duplicates]], ignore_index=True) if len(duplicates) else df
+
+
+def generate_csv(path: str, entities: int, years: int = 65, indicators: int = 1, rates: dict = None,
+                 seed: int = 0, chunk_entities: int = 50_000, profile: dict = None) -> int:
+    """
+    Writes a synthetic CSV in chunks of entities, so memory stays bounded
+    at any scale. rates maps error types to the share of rows carrying
+    them. Returns the number of data rows written.
+    """
+    rates = rates or {}
+    unknown = [error_type for error_type in rates if error_type not in ERROR_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown error types: {unknown}. Choose from {ERROR_TYPES}")
+
+    profile = profile or fit_profile()
+    written = 0
+    for chunk, first_entity in enumerate(range(0, entities, chunk_entities)):
+        rng = np.random.default_rng([seed, chunk])
+        n_entities = min(chunk_entities, entities - first_entity)
+        df = generate_frame(profile, first_entity, n_entities, entities, years, indicators, rates, rng)
+        df.to_csv(path, mode="w" if chunk == 0 else "a", header=chunk == 0, index=False)
+        written += len(df)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=65)
+    parser.add_argument("--indicators", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of rows carrying each error type")
+    parser.add_argument("--rate", action="append", default=[], metavar="TYPE=SHARE",
+                        help=f"override one error type's rate ({', '.join(ERROR_TYPES)})")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rates = dict.fromkeys(ERROR_TYPES, args.error_rate)
+    rates.update({kind: float(share) for kind, share in (item.split("=") for item in args.rate)})
+
+    rows = generate_csv(args.path, args.entities, args.years, args.indicators, rates, args.seed)
+    print(f"{rows:,} rows x {args.years} years written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
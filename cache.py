@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from load_data import load_data
+from cleaner import clean_data_chunked, text_category, print_correction_report, RULES_VERSION
+from incremental import clean_with_state
+from row_ranges import RowRanges
+
+CACHE_DIR = ".cache"
+
+# Bump whenever the cache file layout changes so old caches are rebuilt
+CACHE_FORMAT = 1
+
+
+# ---------- FINGERPRINT ----------
+
+def file_hash(file_path: str) -> str:
+    """SHA-256 of the file contents, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_key(file_path: str, with_hash: bool = True) -> dict:
+    """Cache key of a source file: size, mtime, content hash and rules version."""
+    stat = os.stat(file_path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_hash(file_path) if with_hash else None,
+        "rules_version": RULES_VERSION
+    }
+
+
+def cache_name(file_path: str) -> str:
+    """File name plus a digest of its absolute path, so same-named sources never share entries."""
+    digest = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16]
+    return f"{os.path.basename(file_path)}-{digest}"
+
+
+def cache_paths(file_path: str, cache_dir: str = CACHE_DIR):
+    base = os.path.join(cache_dir, cache_name(file_path) + ".clean")
+    return base + ".npz", base + ".json"
+
+
+def state_path(file_path: str, cache_dir: str = CACHE_DIR) -> str:
+    # Per-row hashes and check results used for incremental re-cleaning
+    return os.path.join(cache_dir, cache_name(file_path) + ".state.npz")
+
+
+# ---------- READ / WRITE ----------
+
+def save_clean_cache(file_path: str, cleaned_df: pd.DataFrame, error_log: dict,
+                     key: dict = None, cache_dir: str = CACHE_DIR):
+    """
+    Persist the cleaned frame column by column (.npz) with its error log as
+    ranges (.json). Text columns are stored as category codes + categories.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = cache_paths(file_path, cache_dir)
+    key = key or file_key(file_path)
+
+    text_cols = [c for c in cleaned_df.columns if not pd.api.types.is_float_dtype(cleaned_df[c])]
+    arrays = {}
+    for i, col in enumerate(cleaned_df.columns):
+        if col in text_cols:
+            values = cleaned_df[col].astype("category").array
+            arrays[f"c{i}"] = values.codes
+            arrays[f"k{i}"] = np.asarray(values.categories, dtype=str)
+        else:
+            arrays[f"c{i}"] = cleaned_df[col].to_numpy(dtype=float)
+
+    meta = {
+        "format": CACHE_FORMAT,
+        "key": key,
+        "columns": list(cleaned_df.columns),
+        "text_columns": text_cols,
+        "error_ranges": {k: v.to_json() for k, v in error_log.items()}
+    }
+
+    # Write to temporary files first so a crash never leaves a half-written cache
+    with open(data_path + ".tmp", "wb") as file:
+        np.savez(file, **arrays)
+    with open(meta_path + ".tmp", "w") as file:
+        json.dump(meta, file)
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def read_cache_meta(file_path: str, cache_dir: str = CACHE_DIR):
+    _, meta_path = cache_paths(file_path, cache_dir)
+    try:
+        with open(meta_path, "r") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == CACHE_FORMAT else None
+
+
+def load_clean_cache(file_path: str, meta: dict, cache_dir: str = CACHE_DIR):
+    """Rebuild (cleaned_df, error_log) from the cache files."""
+    data_path, _ = cache_paths(file_path, cache_dir)
+    text_cols = set(meta["text_columns"])
+
+    with np.load(data_path, allow_pickle=False) as arrays:
+        columns = {
+            col: (text_category(arrays[f"c{i}"], arrays[f"k{i}"]) if col in text_cols
+                  else arrays[f"c{i}"])
+            for i, col in enumerate(meta["columns"])
+        }
+
+    return pd.DataFrame(columns), {k: RowRanges.from_json(v) for k, v in meta["error_ranges"].items()}
+
+
+def is_fresh(file_path: str, meta: dict) -> bool:
+    """Check whether a cache entry still matches the source file.
+
+    Size and mtime are compared first; the content hash is only computed
+    when the file was touched, so an unchanged file is never re-read.
+    """
+    if meta is None or meta["key"]["rules_version"] != RULES_VERSION:
+        return False
+
+    current = file_key(file_path, with_hash=False)
+    if current["size"] != meta["key"]["size"]:
+        return False
+    if current["mtime_ns"] == meta["key"]["mtime_ns"]:
+        return True
+    return file_hash(file_path) == meta["key"]["sha256"]
+
+
+def data_version(file_path: str, cache_dir: str = CACHE_DIR):
+    """Content hash of the source the cached cleaned frame was built from."""
+    meta = read_cache_meta(file_path, cache_dir)
+    return None if meta is None else meta["key"]["sha256"]
+
+
+# ---------- MAIN ENTRY ----------
+
+def load_clean_cached(file_path: str, cache_dir: str = CACHE_DIR, chunksize: int = None,
+                      workers: int = None):
+    """
+    Cached equivalent of clean_data(load_data(file_path)).
+
+    Warm runs read the cleaned frame and error log straight from the
+    binary cache; cold runs parse the CSV, re-check only rows and columns
+    that changed since the previous run, and refresh the cache.
+    With a chunksize, cold runs stream the CSV through clean_data_chunked;
+    with workers, cleans spread the row checks over a process pool.
+    """
+    meta = read_cache_meta(file_path, cache_dir)
+
+    if is_fresh(file_path, meta):
+        cleaned_df, error_log = load_clean_cache(file_path, meta, cache_dir)
+
+        # File was touched but not changed: remember the new mtime
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        if mtime_ns != meta["key"]["mtime_ns"]:
+            meta["key"]["mtime_ns"] = mtime_ns
+            _, meta_path = cache_paths(file_path, cache_dir)
+            # Swapped in whole, as in save_clean_cache, so readers never see half a file
+            with open(meta_path + ".tmp", "w") as file:
+                json.dump(meta, file)
+            os.replace(meta_path + ".tmp", meta_path)
+
+        # Same terminal output as a cold run
+        print_correction_report(error_log["corrected_gdp"])
+        return cleaned_df, error_log
+
+    key = file_key(file_path)
+    if chunksize:
+        cleaned_df, error_log = clean_data_chunked(load_data(file_path, chunksize))
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        cleaned_df, error_log = clean_with_state(load_data(file_path), state_path(file_path, cache_dir), workers)
+    save_clean_cache(file_path, cleaned_df, error_log, key, cache_dir)
+    return cleaned_df, error_log
@@ -1,94 +1,340 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 
+from row_ranges import RowRanges
+from profiler import profiled
+
+# Bump whenever the cleaning rules change so cached cleaned output is rebuilt
+RULES_VERSION = 1
+
+# Text columns
+TEXT_COLS = [
+    "Country Name",
+    "Country Code",
+    "Indicator Name",
+    "Indicator Code",
+    "Continent"
+]
+
+@profiled
 def clean_data(df: pd.DataFrame):
-    # Work on a copy
-    df = df.copy()
+    df, error_log = clean_frame(df)
+    print_correction_report(error_log["corrected_gdp"])
+    return df.reset_index(drop=True), error_log
 
-    # ---------- ERROR LOG ----------
-    error_log = {
-        "text_errors": [],
-        "empty_country": [],
-        "gdp_alpha": [],
-        "empty_gdp": [],
-        "invalid_continent": []
-    }
 
-    # Text columns
-    text_cols = [
-        "Country Name",
-        "Country Code",
-        "Indicator Name",
-        "Indicator Code",
-        "Continent"
-    ]
+VALID_CONTINENTS = {
+    "Asia", "Europe", "Africa",
+    "North America", "South America",
+    "Oceania", "Global"
+}
 
-    # GDP columns
-    gdp_cols = df.columns.difference(text_cols)
 
+def clean_frame(df: pd.DataFrame, drop_duplicates: bool = True):
+    """
+    Runs every cleaning check on df and returns (cleaned_df, error_log).
+    The original index is kept so row numbers stay those of the source file.
+    Pass drop_duplicates=False when duplicates were already removed upstream.
+    """
     # ---------- REMOVE DUPLICATES ----------
-    df = df.drop_duplicates()
-
-    # ---------- TEXT CLEANING ----------
-    df[text_cols] = df[text_cols].astype("string").fillna("")
-
-    # ---------- TEXT VALIDATION ----------
-    bad_text_rows = df[text_cols].apply(
-        lambda c: c.str.contains(r"\d")
-    ).any(axis=1)
-
-    error_log["text_errors"] = (df.index[bad_text_rows] + 2).tolist()
-    df = df[~bad_text_rows]
-
-    # ---------- EMPTY COUNTRY ----------
-    bad_country_rows = df["Country Name"].str.strip().eq("")
-    error_log["empty_country"] = (df.index[bad_country_rows] + 2).tolist()
-    df = df[~bad_country_rows]
-
-    # ---------- GDP LETTER CHECK ----------
-    # First convert to numeric 
-    gdp_original = df[gdp_cols].copy()
-    gdp_numeric = df[gdp_cols].apply(pd.to_numeric, errors="coerce")
-    
-    # Find cells that were not originally empty
-    was_not_empty = gdp_original.notna()
-    
-    # Find cells that became NaN after numeric conversion
-    became_nan = gdp_numeric.isna()
-    
-    # Cells with invalid data are those that had values but became NaN
-    has_invalid_data = was_not_empty & became_nan
-    bad_gdp_rows = has_invalid_data.any(axis=1)
-
-    error_log["corrected_gdp"] = (df.index[bad_gdp_rows] + 2).tolist()
+    if drop_duplicates:
+        duplicated = duplicated_rows(df)
+        if duplicated.any():
+            df = df[~duplicated]
+
+    masks, text, gdp = check_rows(df)
+    return assemble(df.index, df.columns, masks, text, gdp)
+
+
+def value_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every row's parsed values; equal rows get equal hashes."""
+    # -0.0 == 0.0 for duplicated(), but not for the hash
+    float_cols = df.columns[[pd.api.types.is_float_dtype(t) for t in df.dtypes]]
+    hash_input = df.assign(**{col: df[col] + 0.0 for col in float_cols})
+    return pd.util.hash_pandas_object(hash_input, index=False).to_numpy()
+
+
+def duplicated_rows(df: pd.DataFrame, hashes: np.ndarray = None) -> np.ndarray:
+    """
+    Same result as df.duplicated(), but only rows sharing a 64-bit row hash
+    are compared value by value, instead of factorizing every column.
+    Pass precomputed value_hashes(df) to skip hashing.
+    """
+    if hashes is None:
+        hashes = value_hashes(df)
+
+    duplicated = np.zeros(len(df), dtype=bool)
+    candidates = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    if candidates.any():
+        duplicated[candidates] = df[candidates].duplicated().to_numpy()
+    return duplicated
+
+
+def check_rows(df: pd.DataFrame):
+    """
+    Single pass over df computing every row-level check at once.
+
+    Returns (masks, text, gdp):
+    masks : boolean arrays "text_errors", "empty_country", "corrected_gdp",
+            "empty_gdp" and "invalid_continent", each judged on its own
+    text  : cleaned text columns as categoricals (missing values as "")
+    gdp   : float matrix of the GDP columns, invalid or missing cells as 0.0
+    """
+    text_masks, text = check_text(df)
+
+    # ---------- GDP CONVERSION + LETTER CHECK ----------
+    gdp, corrected_gdp = convert_gdp(df, [col for col in df.columns if col not in TEXT_COLS])
+
+    # ---------- EMPTY GDP ----------
+    empty_gdp = (gdp == 0).all(axis=1)
+
+    masks = {
+        "text_errors": text_masks["text_errors"],
+        "empty_country": text_masks["empty_country"],
+        "corrected_gdp": corrected_gdp,
+        "empty_gdp": empty_gdp,
+        "invalid_continent": text_masks["invalid_continent"]
+    }
+    return masks, text, gdp
+
+
+def check_text(df: pd.DataFrame):
+    """
+    The checks that depend on text columns alone. Returns (masks, text):
+    "text_errors", "empty_country" and "invalid_continent" masks, and the
+    cleaned text columns as categoricals.
+    """
+    n_rows = len(df)
+
+    # ---------- TEXT CLEANING + VALIDATION ----------
+    # Text values repeat heavily, so each check runs once per distinct value
+    text = {}
+    has_digit = np.zeros(n_rows, dtype=bool)
+
+    for col in TEXT_COLS:
+        values = df[col].astype("string").fillna("")
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Series(uniques, dtype="string")
+
+        has_digit |= uniques.str.contains(r"\d").to_numpy(dtype=bool)[codes]
+        text[col] = (values, codes, uniques)
+
+    def per_value(col, check):
+        _, codes, uniques = text[col]
+        return check(uniques).to_numpy(dtype=bool)[codes]
+
+    masks = {
+        "text_errors": has_digit,
+        "empty_country": per_value("Country Name", lambda names: names.str.strip().eq("")),
+        "invalid_continent": per_value("Continent", lambda names: ~names.isin(VALID_CONTINENTS))
+    }
+    return masks, {col: text_category(codes, uniques) for col, (_, codes, uniques) in text.items()}
+
+
+def text_category(codes: np.ndarray, categories) -> pd.Categorical:
+    """
+    Text column dictionary-encoded as int codes into its distinct values.
+
+    Country, indicator and continent names repeat on every row (and 65
+    times more in the long frame), so each distinct string is stored once.
+    Categories are sorted, so group-bys come out in the same order as on
+    plain strings whichever path built the column.
+    """
+    categories = pd.Index(categories, dtype="string")
+    order = categories.argsort()
+    if np.any(order != np.arange(len(order))):
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        codes, categories = rank[codes], categories[order]
+    return pd.Categorical.from_codes(codes, categories=categories, validate=False)
+
+
+def convert_gdp(df: pd.DataFrame, gdp_cols: list):
+    """
+    Converts the GDP columns into one float matrix (invalid or missing cells
+    become 0.0) and flags rows that held non-numeric GDP text.
+    """
+    n_rows = len(df)
+    gdp = np.empty((n_rows, len(gdp_cols)), order="F")
+    corrected_gdp = np.zeros(n_rows, dtype=bool)
+
+    for j, col in enumerate(gdp_cols):
+        raw = df[col]
+        if pd.api.types.is_numeric_dtype(raw):
+            gdp[:, j] = raw.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            # Cells with invalid data are those that had values but became NaN
+            gdp[:, j] = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            corrected_gdp |= raw.notna().to_numpy() & np.isnan(gdp[:, j])
+
+    np.copyto(gdp, 0.0, where=np.isnan(gdp))
+    return gdp, corrected_gdp
+
+
+def assemble(index: pd.Index, columns: pd.Index, masks: dict, text: dict, gdp: np.ndarray):
+    """Turns independent row masks into the error log and the cleaned frame."""
+    error_log, removed = error_log_of(index, masks)
 
+    # ---------- SINGLE COMBINED FILTER ----------
+    keep = ~removed
+    kept_index = index[keep]
+    gdp_cols = [col for col in columns if col not in TEXT_COLS]
+
+    if not keep.all():
+        text = {col: values[keep].remove_unused_categories() for col, values in text.items()}
+
+    cleaned = pd.concat([
+        pd.DataFrame(text, index=kept_index),
+        pd.DataFrame(gdp if keep.all() else gdp[keep], index=kept_index, columns=gdp_cols)
+    ], axis=1)
+
+    # ---------- RETURN ----------
+    return cleaned[list(columns)], error_log
+
+
+def error_log_of(index: pd.Index, masks: dict):
+    """
+    Error log of independent row masks, and the rows it removes.
+
+    Checks apply in order and a row is reported only by the first check that
+    removes it (corrected GDP is reported for rows surviving the text checks).
+    Each category holds its source row numbers as RowRanges.
+    """
+    removed = np.zeros(len(index), dtype=bool)
+
+    def report(mask):
+        return RowRanges.from_rows(index[mask & ~removed] + 2)
+
+    # ---------- ERROR LOG ----------
+    error_log = {"text_errors": report(masks["text_errors"])}
+    removed |= masks["text_errors"]
+
+    error_log["empty_country"] = report(masks["empty_country"])
+    removed |= masks["empty_country"]
+
+    error_log["gdp_alpha"] = RowRanges()
+    corrected_gdp = report(masks["corrected_gdp"])
+
+    error_log["empty_gdp"] = report(masks["empty_gdp"])
+    removed |= masks["empty_gdp"]
+
+    error_log["invalid_continent"] = report(masks["invalid_continent"])
+    removed |= masks["invalid_continent"]
+
+    error_log["corrected_gdp"] = corrected_gdp
+    return error_log, removed
+
+
+def print_correction_report(corrected_rows: RowRanges):
     # Print corrected GDP rows to terminal
-    if bad_gdp_rows.any():
+    if corrected_rows:
         print("\n" + "="*60)
         print("⚠️  GDP CORRECTION REPORT")
         print("="*60)
-        corrected_rows = (df.index[bad_gdp_rows] + 2).tolist()
-        print(f"The following rows had invalid GDP values and were corrected to 0.00:")
-        print(f"Row Numbers: {corrected_rows}")
+        print(f"{len(corrected_rows)} rows had invalid GDP values and were corrected to 0.00:")
+        print(f"Row Numbers: {corrected_rows.format()}")
         print("="*60 + "\n")
 
-    # Use the already-converted numeric data
-    df[gdp_cols] = gdp_numeric.fillna(0.0).astype(float)
 
-    # ---------- EMPTY GDP ----------
-    empty_gdp_rows = (df[gdp_cols] == 0).all(axis=1)
-    error_log["empty_gdp"] = (df.index[empty_gdp_rows] + 2).tolist()
-    df = df[~empty_gdp_rows]
-
-    # ---------- CONTINENT VALIDATION ----------
-    valid_continents = {
-        "Asia", "Europe", "Africa",
-        "North America", "South America",
-        "Oceania", "Global"
-    }
+# ---------- STREAMING ----------
 
-    bad_continent_rows = ~df["Continent"].isin(valid_continents)
-    error_log["invalid_continent"] = (df.index[bad_continent_rows] + 2).tolist()
-    df = df[~bad_continent_rows]
+def clean_chunks(chunks):
+    """
+    Cleans an iterable of DataFrame chunks (e.g. load_data(path, chunksize=n))
+    one at a time, yielding (cleaned_chunk, chunk_error_log) pairs.
 
-    # ---------- RETURN ----------
-    return df.reset_index(drop=True), error_log
\ No newline at end of file
+    Chunks from pd.read_csv keep a running index, so row numbers in each
+    chunk's error log are those of the full file. Duplicates within a
+    chunk are confirmed value by value, as in clean_data. Across chunk
+    boundaries only a 64-bit hash of every row already seen is kept (8
+    bytes per unique row), so a row is dropped when its hash matches an
+    earlier chunk's row: this is probabilistic, and with n unique rows the
+    chance of any false match is about n**2 / 2**65 (under 1e-5 for ten
+    million rows). Use clean_data when that risk is not acceptable.
+    """
+    seen = np.empty(0, dtype=np.uint64)
+
+    for chunk in chunks:
+        hashes = row_hashes(chunk)
+        duplicate = duplicated_rows(chunk, hashes) | np.isin(hashes, seen)
+        seen = np.union1d(seen, hashes[~duplicate])
+
+        yield clean_frame(chunk[~duplicate])
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of every raw row, independent of how pandas typed each column.
+
+    A GDP column holding a stray letter is parsed as text in one chunk (or
+    one run) and as float in the next, so GDP cells are hashed by numeric
+    value and only the unparseable cells by their text.
+    """
+    def column_hash(col):
+        values = df[col]
+        if col in TEXT_COLS:
+            # A text column with no values at all is parsed as float
+            if not pd.api.types.is_string_dtype(values):
+                values = values.astype("string")
+        else:
+            if not pd.api.types.is_float_dtype(values):
+                values = pd.to_numeric(values, errors="coerce").astype(float)
+            values = values + 0.0  # -0.0 == 0.0
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+    # Same column mixing as pd.util.hash_pandas_object, one column at a time
+    hashes = np.full(len(df), 0x345678, dtype=np.uint64)
+    mult = np.uint64(1000003)
+    for i, col in enumerate(df.columns):
+        hashes ^= column_hash(col)
+        hashes *= mult
+        mult += np.uint64(82520 + 2 * (len(df.columns) - i))
+    hashes += np.uint64(97531)
+
+    # Fold every unparseable cell (column name + text) into its row's hash
+    gdp_raw = df[df.columns.difference(TEXT_COLS)]
+    text_typed = [c for c in gdp_raw.columns if not pd.api.types.is_numeric_dtype(gdp_raw[c])]
+    raw = gdp_raw[text_typed]
+    cells = raw.where(raw.apply(pd.to_numeric, errors="coerce").isna()).stack().dropna()
+
+    if len(cells):
+        keys = cells.index.get_level_values(1).astype(str) + "\x1f" + cells.astype(str).to_numpy()
+        cell_hashes = pd.util.hash_array(np.asarray(keys, dtype=object))
+        positions = df.index.get_indexer(cells.index.get_level_values(0))
+        np.bitwise_xor.at(hashes, positions, cell_hashes)
+
+    return hashes
+
+
+def clean_data_chunked(chunks):
+    """
+    Streaming equivalent of clean_data: only one raw chunk is held in
+    memory at a time, while the cleaned rows and error log accumulate.
+    """
+    cleaned_parts = []
+    error_parts = {}
+
+    for cleaned, chunk_errors in clean_chunks(chunks):
+        cleaned_parts.append(cleaned)
+        for error_type, rows in chunk_errors.items():
+            error_parts.setdefault(error_type, []).append(rows)
+
+    if not cleaned_parts:
+        # No chunks at all: an empty frame of the text columns and an empty log
+        return clean_frame(pd.DataFrame(columns=TEXT_COLS))
+
+    error_log = {error_type: RowRanges.union(*parts) for error_type, parts in error_parts.items()}
+    print_correction_report(error_log.get("corrected_gdp", RowRanges()))
+    return concat_cleaned(cleaned_parts), error_log
+
+
+def concat_cleaned(parts: list) -> pd.DataFrame:
+    """pd.concat for cleaned frames whose text columns have different categories."""
+    cleaned = pd.concat(
+        [part.drop(columns=TEXT_COLS) for part in parts],
+        ignore_index=True
+    )
+    for col in TEXT_COLS:
+        cleaned[col] = union_categoricals([part[col].array for part in parts], sort_categories=True)
+    return cleaned[list(parts[0].columns)]
\ No newline at end of file
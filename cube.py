@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import TEXT_COLS
+from matrix_store import GDPMatrix
+
+# Columns identifying an entity (a country or aggregate region)
+ENTITY_COLS = ["Country Name", "Country Code", "Continent"]
+
+
+# ---------- CUBE ----------
+
+class DataCube:
+    """
+    Cleaned WDI data pivoted once into a dense entity x indicator x year array.
+
+    values[e, i, y] holds entity e's value of indicator i in year y, NaN
+    where the file has no row for that entity and indicator. indicator()
+    slices one indicator out as a GDPMatrix, so filters, process and the
+    visualizers work on it exactly as on the matrix store.
+    """
+
+    def __init__(self, values, present, years, entities, indicators):
+        self.values = values
+        self.present = present
+        self.years = years
+        self.entities = entities
+        self.indicators = indicators
+
+    @classmethod
+    def from_frame(cls, cleaned_df: pd.DataFrame):
+        """
+        Pivots the wide cleaned frame. A WDI dump has one row per entity and
+        indicator; if a file repeats one, the first row is used.
+        """
+        year_cols = [col for col in cleaned_df.columns if col not in TEXT_COLS]
+
+        entity = cleaned_df.groupby(ENTITY_COLS, sort=False, observed=True).ngroup().to_numpy()
+        indicator, indicator_codes = pd.factorize(cleaned_df["Indicator Code"])
+        n_entities = entity.max() + 1 if len(entity) else 0
+        n_indicators = len(indicator_codes)
+
+        first = ~pd.Series(entity * n_indicators + indicator).duplicated().to_numpy()
+        entity, indicator = entity[first], indicator[first]
+
+        values = np.full((n_entities, n_indicators, len(year_cols)), np.nan)
+        values[entity, indicator] = cleaned_df[year_cols].to_numpy(dtype=float)[first]
+        present = np.zeros((n_entities, n_indicators), dtype=bool)
+        present[entity, indicator] = True
+
+        def first_of(codes, cols):
+            # Side values of each entity / indicator, from its first row
+            positions = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+            rows = cleaned_df.iloc[np.flatnonzero(first)[positions]]
+            return {col: rows[col].to_numpy(dtype=str) for col in cols}
+
+        return cls(
+            values,
+            present,
+            np.array(year_cols, dtype=np.int64),
+            first_of(entity, ENTITY_COLS),
+            first_of(indicator, ["Indicator Code", "Indicator Name"])
+        )
+
+    def __len__(self):
+        return int(self.present.sum()) * len(self.years)
+
+    # ---------- SLICING ----------
+
+    def indicator_position(self, indicator=None) -> int:
+        """Position of an indicator given by code or name (None: the only one)."""
+        # Validated configs hold a list, which must name a single indicator here
+        if isinstance(indicator, list):
+            if len(indicator) > 1:
+                raise ValueError("Select a single indicator to aggregate")
+            indicator = indicator[0] if indicator else None
+
+        if indicator is None:
+            if len(self.indicators["Indicator Code"]) != 1:
+                raise ValueError("Data holds several indicators; choose one with 'indicator'")
+            return 0
+
+        for col in ("Indicator Code", "Indicator Name"):
+            matches = np.flatnonzero(self.indicators[col] == indicator)
+            if len(matches):
+                return int(matches[0])
+        raise KeyError(f"Unknown indicator: {indicator}")
+
+    def indicator(self, indicator=None) -> GDPMatrix:
+        """Entities x years matrix of one indicator, for entities that report it."""
+        k = self.indicator_position(indicator)
+        rows = np.flatnonzero(self.present[:, k])
+
+        side = {col: values[rows] for col, values in self.entities.items()}
+        for col, values in self.indicators.items():
+            side[col] = np.full(len(rows), values[k])
+
+        return GDPMatrix(self.values[rows, k], self.years, side)
@@ -1,8 +1,14 @@
 from load_data import load_data
 from cleaner import clean_data
 from load_json import load_json
+from matrix_store import GDPMatrix
+from transform import LongView
+from profiler import profiled
 
+@profiled
 def filter_by_country(df, config:dict):
+    if isinstance(df, (GDPMatrix, LongView)): # Slice the matrix store / long view directly
+        return df.select(countries=config.get("country"))
     if "country" in config: 
         if isinstance(config["country"], list): 
             df = df[df["Country Name"].isin(config["country"])] 
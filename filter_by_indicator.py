@@ -0,0 +1,14 @@
+from matrix_store import GDPMatrix
+from transform import LongView
+from profiler import profiled
+
+@profiled
+def filter_by_indicator(df, config: dict):
+    # validate_json leaves at most one indicator outside --cube; none means the file holds only one
+    indicators = config.get("indicator")
+    if not indicators:
+        return df
+    if isinstance(df, (GDPMatrix, LongView)): # Slice the matrix store / long view directly
+        return df.select(indicators=indicators)
+    indicators = indicators if isinstance(indicators, list) else [indicators]
+    return df[df["Indicator Code"].isin(indicators) | df["Indicator Name"].isin(indicators)]
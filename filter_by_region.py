@@ -1,8 +1,14 @@
 from load_data import load_data
 from cleaner import clean_data
 from load_json import load_json
+from matrix_store import GDPMatrix
+from transform import LongView
+from profiler import profiled
 
+@profiled
 def filter_by_region(df, config:dict):
+    if isinstance(df, (GDPMatrix, LongView)): # Slice the matrix store / long view directly
+        return df.select(regions=config.get("region"), years=config.get("year"))
     if "region" in config: 
         if isinstance(config["region"], list): 
             df = df[df["Continent"].isin(config["region"])] 
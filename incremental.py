@@ -0,0 +1,211 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaner import (
+    RULES_VERSION, TEXT_COLS, assemble, check_rows, check_text, convert_gdp,
+    duplicated_rows, print_correction_report, text_category, value_hashes
+)
+from parallel import check_text_parallel, check_unique_rows_parallel
+from profiler import profiled
+
+# Checks that depend on the text columns alone: the only results a state keeps
+TEXT_MASKS = ["text_errors", "empty_country", "invalid_continent"]
+
+# Bump whenever the state file layout changes so old state files are ignored
+STATE_FORMAT = 3
+
+
+# ---------- STATE ----------
+# The state of a run keeps, for every unique source row, its cleaned text
+# values (codes into each column's distinct values) and the outcome of the
+# text checks, so the next run only runs those checks on rows whose text it
+# has not seen. GDP is not kept: converting it afresh is cheap and exact.
+
+def code_keys(codes: dict) -> np.ndarray:
+    """64-bit hash of every row's text codes, to find a row's match quickly."""
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({col: np.asarray(values, dtype=np.int64) for col, values in codes.items()}), index=False
+    ).to_numpy()
+
+
+def make_state(masks: dict, text: dict) -> dict:
+    def encode(values):
+        # Text categoricals are stored as their codes + distinct values
+        return values.codes.astype(np.int32), np.asarray(values.categories, dtype=str)
+
+    return {
+        "rules_version": RULES_VERSION,
+        "masks": {name: masks[name] for name in TEXT_MASKS},
+        "text": {col: encode(values) for col, values in text.items()}
+    }
+
+
+def save_state(path: str, state: dict):
+    arrays = {
+        "format": np.array(STATE_FORMAT),
+        "rules_version": np.array(state["rules_version"])
+    }
+    arrays.update({f"mask {name}": values for name, values in state["masks"].items()})
+    arrays.update({f"codes {col}": codes for col, (codes, _) in state["text"].items()})
+    arrays.update({f"text {col}": uniques for col, (_, uniques) in state["text"].items()})
+
+    with open(path + ".tmp", "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(path + ".tmp", path)
+
+
+def load_state(path: str):
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays["format"]) != STATE_FORMAT:
+                return None
+            return {
+                "rules_version": int(arrays["rules_version"]),
+                "masks": {name: arrays[f"mask {name}"] for name in TEXT_MASKS},
+                "text": {col: (arrays[f"codes {col}"], arrays[f"text {col}"]) for col in TEXT_COLS}
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def match_rows(hashes: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Position of each hash in the previous run's hashes, -1 when unseen."""
+    first = ~pd.Index(previous).duplicated()
+    found = pd.Index(previous[first]).get_indexer(hashes)
+    return np.where(found >= 0, np.flatnonzero(first)[found], -1)
+
+
+def merge_categories(codes: np.ndarray, categories: np.ndarray, is_sorted: bool = False) -> pd.Categorical:
+    """
+    Text categorical from codes into concatenated category lists that may
+    repeat values or hold values no row uses any more. is_sorted: categories
+    are one run's distinct values, already in text_category order.
+    """
+    used = np.flatnonzero(np.bincount(codes, minlength=len(categories)))
+    if is_sorted:
+        # Only values no row uses any more are dropped; the order stays
+        remap = np.zeros(len(categories), dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        return pd.Categorical.from_codes(
+            remap[codes], categories=pd.Index(categories[used], dtype="string"), validate=False
+        )
+    values, inverse = np.unique(categories[used], return_inverse=True)
+    remap = np.zeros(len(categories), dtype=np.int64)
+    remap[used] = inverse
+    return text_category(remap[codes], values)
+
+
+# ---------- CLEANING ----------
+
+def clean_full(df: pd.DataFrame, workers: int = None):
+    """
+    clean_data that also returns the state for later incremental runs.
+    With workers, the row checks run in a process pool.
+    """
+    if workers:
+        df, hashes, masks, text, gdp = check_unique_rows_parallel(df, workers)
+    else:
+        hashes = value_hashes(df)
+        unique = ~duplicated_rows(df, hashes)
+        if not unique.all():
+            df = df[unique]
+        masks, text, gdp = check_rows(df)
+
+    cleaned, error_log = assemble(df.index, df.columns, masks, text, gdp)
+
+    print_correction_report(error_log["corrected_gdp"])
+    return cleaned.reset_index(drop=True), error_log, make_state(masks, text)
+
+
+def clean_incremental(df: pd.DataFrame, state: dict, workers: int = None):
+    """
+    Cleans df by reusing the previous run's text checks for rows whose text
+    columns are unchanged.
+
+    The text checks are the costly part of a clean and depend on the text
+    columns alone. Each text value is looked up among the previous run's
+    values, and a row is reused only when all its codes equal those of a
+    previous row, so reuse is exact (the row hash only speeds up finding
+    that row). GDP columns (however many were added) are converted and
+    checked afresh on every row. With workers, the text checks of new or
+    edited rows run in a process pool. Returns (cleaned_df, error_log,
+    new_state, rechecked_rows), or None when there is no usable state.
+    """
+    if state is None or state["rules_version"] != RULES_VERSION:
+        return None
+
+    hashes = value_hashes(df)
+    unique = ~duplicated_rows(df, hashes)
+    if not unique.all():
+        df = df[unique]
+
+    # Position of each text value among the previous run's values (-1: new)
+    prev_codes = {col: state["text"][col][0] for col in TEXT_COLS}
+    codes = {
+        col: pd.Index(state["text"][col][1].astype(object)).get_indexer(df[col].fillna(""))
+        for col in TEXT_COLS
+    }
+    prev_pos = match_rows(code_keys(codes), code_keys(prev_codes))
+
+    # A key match is only a candidate: reuse rows whose codes really are the same
+    candidates = np.flatnonzero(prev_pos >= 0)
+    same = np.ones(len(candidates), dtype=bool)
+    for col in TEXT_COLS:
+        same &= codes[col][candidates] == prev_codes[col][prev_pos[candidates]]
+    reused = candidates[same]
+    changed = np.setdiff1d(np.arange(len(df)), reused, assume_unique=True)
+    prev_pos = prev_pos[reused]
+
+    n_rows = len(df)
+    masks = {name: np.zeros(n_rows, dtype=bool) for name in TEXT_MASKS}
+    text_codes = {col: np.empty(n_rows, dtype=np.int64) for col in TEXT_COLS}
+    categories = {col: state["text"][col][1].astype(object) for col in TEXT_COLS}
+
+    # ---------- UNCHANGED TEXT ----------
+    for name in TEXT_MASKS:
+        masks[name][reused] = state["masks"][name][prev_pos]
+    for col in TEXT_COLS:
+        text_codes[col][reused] = state["text"][col][0][prev_pos]
+
+    # ---------- NEW OR EDITED TEXT ----------
+    if len(changed):
+        changed_masks, changed_text = check_text_parallel(df.iloc[changed], workers) if workers \
+            else check_text(df.iloc[changed])
+        for name in TEXT_MASKS:
+            masks[name][changed] = changed_masks[name]
+        for col in TEXT_COLS:
+            # Codes of changed rows point past the previous run's categories
+            text_codes[col][changed] = changed_text[col].codes.astype(np.int64) + len(categories[col])
+            categories[col] = np.concatenate([
+                categories[col], np.asarray(changed_text[col].categories, dtype=object)
+            ])
+
+    # ---------- GDP (every row) ----------
+    gdp, masks["corrected_gdp"] = convert_gdp(df, [col for col in df.columns if col not in TEXT_COLS])
+    masks["empty_gdp"] = (gdp == 0).all(axis=1)
+
+    # ---------- MERGE ----------
+    text = {col: merge_categories(text_codes[col], categories[col], is_sorted=not len(changed)) for col in TEXT_COLS}
+    cleaned, error_log = assemble(df.index, df.columns, masks, text, gdp)
+    print_correction_report(error_log["corrected_gdp"])
+
+    return cleaned.reset_index(drop=True), error_log, make_state(masks, text), len(changed)
+
+
+@profiled
+def clean_with_state(df: pd.DataFrame, state_path: str, workers: int = None):
+    """
+    Incremental clean against the state saved at state_path, falling back
+    to a full clean, and saves the new state for the next run. With
+    workers, either clean spreads its row checks over that many processes.
+    """
+    result = clean_incremental(df, load_state(state_path), workers)
+    if result is None:
+        cleaned, error_log, state = clean_full(df, workers)
+    else:
+        cleaned, error_log, state, _ = result
+
+    save_state(state_path, state)
+    return cleaned, error_log
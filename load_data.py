@@ -1,5 +1,10 @@
 import pandas as pd # Importing Panda Library
+from profiler import profiled
 
-def load_data(file_path):
+@profiled
+def load_data(file_path, chunksize=None):
+    # With a chunksize, yields DataFrames of that many rows instead of one big one
+    if chunksize:
+        return pd.read_csv(file_path, chunksize=chunksize)
     df = pd.read_csv(file_path) # df = DataFrame (Like Excel sheet)
     return df
\ No newline at end of file
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------- LOOKUP INDEX ----------
+
+class LookupIndex:
+    """
+    Hash map from each distinct value of a column to the sorted row
+    positions holding it, built in one pass. lookup() then costs a dict
+    probe per requested key instead of a scan over every row.
+    """
+
+    def __init__(self, values):
+        codes, keys = pd.factorize(values)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+        self.positions = {key: order[bounds[i]:bounds[i + 1]] for i, key in enumerate(keys)}
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def lookup(self, keys) -> np.ndarray:
+        """Sorted row positions holding any of keys (unknown keys match nothing)."""
+        parts = [self.positions[key] for key in dict.fromkeys(keys) if key in self.positions]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+
+def lookup_either(first: LookupIndex, second: LookupIndex, keys) -> np.ndarray:
+    """Sorted row positions where either index holds one of keys (e.g. a code or a name)."""
+    return np.union1d(first.lookup(keys), second.lookup(keys))
+
+
+def restrict(rows, found: np.ndarray) -> np.ndarray:
+    """found limited to rows (both sorted positions); rows None means all rows."""
+    return found if rows is None else np.intersect1d(rows, found, assume_unique=True)
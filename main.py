@@ -1,47 +1,306 @@
-from load_data import load_data
-from cleaner import clean_data
+import argparse
+import contextlib
+
+from cache import load_clean_cached, data_version
+from memo import RESULTS, set_version, cache_stats
 from load_json import load_json
 from validate_json import validate_json
 from filter_by_region import filter_by_region
 from filter_by_country import filter_by_country
-from transform import transform_to_long
-from visualize_regions import visualize_regions
-from visualize_countries import visualize_countries
-from visualize_errors import visualize_errors
+from filter_by_indicator import filter_by_indicator
+from transform import LongView
+from pushdown import clean_and_validate_pushdown
+from matrix_store import open_matrix_store
+from cube import DataCube
+from planner import compile_plan, run_plan, explain
+from pipeline import StageCache, MAX_STAGE_BYTES, run_pipeline, print_stage_stats
+from process import aggregate_table, table_frame, country_frames
+from visualize_errors import visualize_errors, print_errors
+from profiler import profiled, enable as enable_profiling, finish as finish_profiling
+
+# matplotlib / seaborn load with the chart modules (visualize_regions,
+# visualize_countries, render, batch), imported only once a chart is drawn
+
+DATA_FILE = "gdp_with_continent_filled.csv"
+CONFIG_FILE = "config.json"
+BATCH_OUT_DIR = "batch_output"
+
+
+@profiled
+def main(pushdown=False, matrix=False, cube=False, plan=False, explain_plan=False,
+         workers=None, error_report=None, memo_entries=None, memo_bytes=None, memo_stats=False,
+         headless=None, chart_formats=("png",), render_workers=None, mode="dashboard",
+         pipeline=False, stage_cache_bytes=MAX_STAGE_BYTES):
+    # mode: "dashboard" draws charts, "compute" prints the aggregates
+    # instead, "validate" stops once the config is checked
+
+    if headless and mode == "dashboard":
+        # Charts go to files in this folder instead of windows, optionally
+        # drawn by a pool of render processes
+        from render import set_headless, set_render_workers, close_render_pool
+        set_headless(headless, chart_formats)
+        set_render_workers(render_workers)
+    with result_cache(memo_entries, memo_bytes, memo_stats):
+        try:
+            if pipeline:
+                main_pipeline(error_report, mode, StageCache(max_bytes=stage_cache_bytes), workers)
+            else:
+                run(pushdown, matrix, cube, plan, explain_plan, workers, error_report, mode)
+        finally:
+            # Waits for queued charts and stops the render workers, even after an error
+            if headless and mode == "dashboard":
+                close_render_pool()
+
 
+@contextlib.contextmanager
+def result_cache(memo_entries=None, memo_bytes=None, memo_stats=False):
+    """Bounds the memoized result cache for a run (any mode) and prints its statistics at the end when asked."""
+    RESULTS.resize(memo_entries, memo_bytes)
+    try:
+        yield
+    finally:
+        if memo_stats:
+            print("RESULT CACHE " + ", ".join(f"{name}={value:,}" for name, value in cache_stats().items()))
 
-def main():
 
-    # ---------- LOAD CSV ----------
-    df = load_data("gdp_with_continent_filled.csv")
-    
+def run(pushdown, matrix, cube, plan, explain_plan, workers, error_report, mode):
 
-    # ---------- CLEAN CSV ----------
-    cleaned_df, csv_errors = clean_data(df)
+    if pushdown:
+        return main_pushdown(error_report, mode)
+
+    # ---------- LOAD + CLEAN CSV (cached) ----------
+    cleaned_df, csv_errors = load_clean_cached(DATA_FILE, workers=workers)
+    # Memoized results are keyed by the CSV's content; a changed CSV drops them
+    set_version(cleaned_df, data_version(DATA_FILE), source=DATA_FILE)
 
     # ---------- LOAD JSON ----------
-    config = load_json("config.json")
+    config = load_json(CONFIG_FILE)
 
     # ---------- VALIDATE JSON ----------
-    validated_config, json_errors = validate_json(config, cleaned_df)
+    # Outside --cube a multi-indicator file needs its one "indicator" chosen
+    validated_config, json_errors = validate_json(config, cleaned_df, per_indicator=cube)
 
     # ---------- SHOW ERRORS VISUALLY ----------
-    visualize_errors(csv_errors, json_errors)
+    show_errors(csv_errors, json_errors, error_report, mode)
 
-    # STOP if JSON invalid
-    if json_errors:
+    # STOP if JSON invalid (or only validating)
+    if json_errors or mode == "validate":
         return
 
+    if cube:
+        return main_cube(cleaned_df, validated_config, mode)
+    if plan or explain_plan:
+        return main_plan(cleaned_df, validated_config, explain_plan, mode)
+
     # ---------- TRANSFORM ----------
-    df_long = transform_to_long(cleaned_df)
+    # Lazy long view (or the memory-mapped matrix store): consumers melt
+    # only the years or countries they select
+    if matrix:
+        df_long = open_matrix_store(DATA_FILE, cleaned_df)
+    else:
+        df_long = LongView(cleaned_df)
 
     # ---------- FILTER ----------
+    df_long = filter_by_indicator(df_long, validated_config)
     filtered_countries = filter_by_country(df_long, validated_config)
 
     # ---------- VISUALIZE ----------
-    visualize_regions(df_long, validated_config)
-    visualize_countries(filtered_countries, validated_config)
+    show_dashboard(df_long, filtered_countries, validated_config, mode)
+
+
+def main_plan(cleaned_df, validated_config, show_plan=False, mode="dashboard"):
+    # The whole dashboard answered by one compiled query over the wide data
+
+    # ---------- PLAN + RUN ----------
+    query_plan = compile_plan(validated_config)
+    results, stats = run_plan(query_plan, cleaned_df)
+
+    if show_plan:
+        print(explain(query_plan, stats))
+
+    # ---------- VISUALIZE (pre-sliced inputs) ----------
+    show_dashboard(None, None, validated_config, mode, results["regions"], results["countries"])
+
+
+def main_cube(cleaned_df, validated_config, mode="dashboard"):
+    # One dashboard per indicator, each a slice of a single entity x indicator x year cube
+
+    # ---------- TRANSFORM (pivot once) ----------
+    data_cube = DataCube.from_frame(cleaned_df)
+    indicators = validated_config["indicator"] or list(data_cube.indicators["Indicator Code"])
+
+    for indicator in indicators:
+        # ---------- SLICE ----------
+        df_indicator = data_cube.indicator(indicator)
+        print(f"\n{'INDICATOR: ' + indicator:^60}")
+
+        # ---------- FILTER ----------
+        filtered_countries = filter_by_country(df_indicator, validated_config)
+
+        # ---------- VISUALIZE ----------
+        # Every indicator draws the same chart names: headless files go to <dir>/<indicator code>/
+        if mode == "dashboard":
+            from render import headless_folder
+            folder = headless_folder(data_cube.indicators["Indicator Code"][data_cube.indicator_position(indicator)])
+        else:
+            folder = contextlib.nullcontext()
+        with folder:
+            show_dashboard(df_indicator, filtered_countries, validated_config, mode)
+
+
+def main_pushdown(error_report=None, mode="dashboard"):
+    # Same dashboard, but the config decides which columns and rows are kept
+
+    # ---------- LOAD JSON ----------
+    config = load_json(CONFIG_FILE)
+
+    # ---------- LOAD + CLEAN + VALIDATE (pushed down) ----------
+    region_df, country_df, csv_errors, validated_config, json_errors = \
+        clean_and_validate_pushdown(DATA_FILE, config)
+
+    # ---------- SHOW ERRORS VISUALLY ----------
+    show_errors(csv_errors, json_errors, error_report, mode)
+
+    # STOP if JSON invalid (or only validating)
+    if json_errors or mode == "validate":
+        return
+
+    # ---------- TRANSFORM (only the loaded slices) ----------
+    region_long = filter_by_indicator(LongView(region_df), validated_config)
+    filtered_countries = filter_by_country(filter_by_indicator(LongView(country_df), validated_config), validated_config)
+
+    # ---------- VISUALIZE ----------
+    show_dashboard(region_long, filtered_countries, validated_config, mode)
+
+
+def main_pipeline(error_report=None, mode="dashboard", cache=None, workers=None):
+    # Same dashboard; stages whose inputs are unchanged since an earlier run are read from the stage cache
+
+    # ---------- LOAD JSON ----------
+    config = load_json(CONFIG_FILE)
+
+    # ---------- LOAD -> CLEAN -> VALIDATE -> TRANSFORM -> FILTER -> PROCESS ----------
+    csv_errors, validated_config, json_errors, region_results, country_data, stats = \
+        run_pipeline(DATA_FILE, config, cache, workers)
+    print_stage_stats(stats)
+
+    # ---------- SHOW ERRORS VISUALLY ----------
+    show_errors(csv_errors, json_errors, error_report, mode)
+
+    # STOP if JSON invalid (or only validating)
+    if json_errors or mode == "validate":
+        return
+
+    # ---------- VISUALIZE (cached or fresh results) ----------
+    show_dashboard(None, None, validated_config, mode, region_results, country_data)
+
+
+# ---------- OUTPUT ----------
+
+def show_errors(csv_errors, json_errors, error_report, mode):
+    if mode == "dashboard":
+        visualize_errors(csv_errors, json_errors, error_report)
+    else:
+        print_errors(csv_errors, json_errors, error_report)
+
+
+def show_dashboard(df_long, filtered_countries, validated_config, mode,
+                   region_results=None, country_data=None):
+    """Region and country charts, or in compute mode their aggregates as text."""
+    if mode == "compute":
+        return print_results(df_long, filtered_countries, validated_config, region_results, country_data)
+
+    # First chart of the run: the plotting stack is imported here
+    from visualize_regions import visualize_regions
+    from visualize_countries import visualize_countries
+
+    visualize_regions(df_long, validated_config, region_results=region_results)
+    visualize_countries(filtered_countries, validated_config, country_data=country_data)
+
+
+def print_results(df_long, filtered_countries, validated_config, region_results=None, country_data=None):
+    years, operation = validated_config["year"], validated_config["operation"]
+
+    if region_results is None:
+        table = aggregate_table(df_long, years, [operation])
+        region_results = {year: table_frame(table, operation, year) for year in years}
+    if country_data is None:
+        country_data = country_frames(filtered_countries, validated_config["country"], operation)
+
+    for year, frame in region_results.items():
+        print(f"\n{'Year: ' + str(year):^60}")
+        print(frame.to_string(index=False))
+    for country, frame in country_data.items():
+        print(f"\n{country:^60}")
+        print(frame.to_string(index=False))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="GDP Analysis and Visualization Dashboard")
+    parser.add_argument("--pushdown", action="store_true",
+                        help="keep only the years and countries named in config.json in memory")
+    parser.add_argument("--matrix", action="store_true",
+                        help="read GDP from the memory-mapped country x year matrix store")
+    parser.add_argument("--plan", action="store_true",
+                        help="answer every chart from one compiled query over the cleaned data")
+    parser.add_argument("--explain", action="store_true",
+                        help="like --plan, and print the query plan with per-step row counts")
+    parser.add_argument("--cube", action="store_true",
+                        help="pivot into an entity x indicator x year cube, one dashboard per indicator")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="run the CSV row checks (full or incremental clean) over this many worker processes")
+    parser.add_argument("--error-report", metavar="PATH", default=None,
+                        help="write every flagged CSV row number to this file")
+    parser.add_argument("--memo-entries", type=int, default=None,
+                        help="keep at most this many memoized aggregation results")
+    parser.add_argument("--memo-bytes", type=int, default=None,
+                        help="keep at most this many bytes of memoized aggregation results")
+    parser.add_argument("--memo-stats", action="store_true",
+                        help="print result cache hits, misses and evictions at the end")
+    parser.add_argument("--batch", metavar="PATH", default=None,
+                        help="run every config in a directory of .json files or a JSON-lines file over one load of the data")
+    parser.add_argument("--out", metavar="DIR", default=BATCH_OUT_DIR,
+                        help="folder receiving one sub-folder of results and charts per batch config")
+    parser.add_argument("--no-charts", action="store_true",
+                        help="print (or, with --batch, write) the aggregated results without drawing charts")
+    parser.add_argument("--validate-only", action="store_true",
+                        help="stop after loading the data and validating config.json")
+    parser.add_argument("--headless", metavar="DIR", default=None,
+                        help="write every chart to files in DIR instead of opening windows")
+    parser.add_argument("--format", default="png",
+                        help="comma-separated chart formats for --headless and --batch (png, svg, pdf)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run the stages through the content-addressed stage cache, skipping unchanged ones")
+    parser.add_argument("--stage-cache-bytes", type=int, default=MAX_STAGE_BYTES,
+                        help="with --pipeline, keep at most this many bytes of cached stage outputs")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="record time, CPU, peak memory and rows per stage; write a Chrome trace to PATH "
+                             "(or set GDP_PROFILE=PATH)")
+    parser.add_argument("--render-workers", type=int, default=None,
+                        help="with --headless or --batch, draw charts over this many worker processes")
+    parser.add_argument("--serve", metavar="PORT", type=int, default=None,
+                        help="keep the cleaned data in memory and answer config JSON POSTed to http://HOST:PORT/query")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="with --serve, the address to listen on")
+    args = parser.parse_args()
+    chart_formats = args.format.split(",")
+    if args.profile:
+        enable_profiling()
+    if args.serve is not None:
+        from server import serve
+        with result_cache(args.memo_entries, args.memo_bytes, args.memo_stats):
+            serve(DATA_FILE, args.host, args.serve, workers=args.workers)
+    elif args.batch:
+        from batch import run_batch
+        with result_cache(args.memo_entries, args.memo_bytes, args.memo_stats):
+            run_batch(DATA_FILE, args.batch, args.out, charts=not args.no_charts, workers=args.workers,
+                      chart_formats=chart_formats, render_workers=args.render_workers)
+    else:
+        main(pushdown=args.pushdown, matrix=args.matrix, cube=args.cube, plan=args.plan,
+             explain_plan=args.explain, workers=args.workers, error_report=args.error_report,
+             memo_entries=args.memo_entries, memo_bytes=args.memo_bytes, memo_stats=args.memo_stats,
+             headless=args.headless, chart_formats=chart_formats, render_workers=args.render_workers,
+             mode="validate" if args.validate_only else "compute" if args.no_charts else "dashboard",
+             pipeline=args.pipeline, stage_cache_bytes=args.stage_cache_bytes)
+    if args.profile:
+        finish_profiling(args.profile)
@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, cache_name, file_key, is_fresh
+from cleaner import text_category
+from lookup import LookupIndex, lookup_either, restrict
+from aggregate import AGGREGATIONS, STATISTICS, AggregateResult, group_statistics
+
+STORE_DIR = os.path.join(CACHE_DIR, "matrix")
+
+# Side arrays stored next to the GDP matrix, one entry per entity (row)
+SIDE_COLS = {
+    "Country Name": "country_name",
+    "Country Code": "country_code",
+    "Indicator Name": "indicator_name",
+    "Indicator Code": "indicator_code",
+    "Continent": "continent"
+}
+
+
+# ---------- STORE ----------
+
+class GDPMatrix:
+    """
+    Cleaned GDP data as a dense entities x years float matrix.
+
+    Arrays opened from disk are memory-mapped read-only, so every process
+    reading the same store shares one copy through the OS page cache.
+    select() returns a smaller GDPMatrix holding only the requested slice;
+    its country / continent lookups probe LookupIndexes built on first use.
+    """
+
+    def __init__(self, gdp, years, side):
+        self.gdp = gdp
+        self.years = years
+        self.side = side
+        self.indexes = {}
+
+    @classmethod
+    def open(cls, directory: str):
+        def load(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+
+        side = {col: load(name) for col, name in SIDE_COLS.items()}
+        return cls(load("gdp"), load("years"), side)
+
+    def __len__(self):
+        return self.gdp.shape[0] * self.gdp.shape[1]
+
+    # ---------- SLICING ----------
+
+    def index(self, col: str) -> LookupIndex:
+        if col not in self.indexes:
+            self.indexes[col] = LookupIndex(self.side[col])
+        return self.indexes[col]
+
+    def row_positions(self, countries=None, regions=None, indicators=None):
+        rows = None
+        if countries is not None:
+            rows = restrict(rows, self.index("Country Name").lookup(as_list(countries)))
+        if regions is not None:
+            rows = restrict(rows, self.index("Continent").lookup(as_list(regions)))
+        if indicators is not None:
+            found = lookup_either(self.index("Indicator Code"), self.index("Indicator Name"), as_list(indicators))
+            rows = restrict(rows, found)
+        return np.arange(self.gdp.shape[0]) if rows is None else rows
+
+    def year_positions(self, years):
+        return np.flatnonzero(np.isin(self.years, as_list(years)))
+
+    def select(self, countries=None, regions=None, years=None, indicators=None):
+        """Slice by country names, continents, years and/or indicator codes or names."""
+        rows = self.row_positions(countries, regions, indicators)
+        if years is None:
+            gdp, year_values = self.gdp[rows], self.years
+        else:
+            cols = self.year_positions(years)
+            gdp, year_values = self.gdp[np.ix_(rows, cols)], self.years[cols]
+
+        return GDPMatrix(
+            gdp,
+            year_values,
+            {col: values[rows] for col, values in self.side.items()}
+        )
+
+    # ---------- CONVERSION ----------
+
+    def to_long(self) -> pd.DataFrame:
+        """Same frame transform_to_long builds for these rows and years."""
+        n_rows, n_years = self.gdp.shape
+
+        def repeated(values):
+            # Only the category codes are repeated for every year
+            categories, codes = np.unique(values, return_inverse=True)
+            return text_category(np.tile(codes, n_years), categories)
+
+        columns = {col: repeated(values) for col, values in self.side.items()}
+        columns["Year"] = np.repeat(self.years.astype(int), n_rows)
+        columns["GDP"] = np.asarray(self.gdp).ravel(order="F")
+        return pd.DataFrame(columns)
+
+    # ---------- AGGREGATION ----------
+
+    def statistics(self, group_by: str, statistics=STATISTICS) -> AggregateResult:
+        """
+        GDP statistics of every cell grouped by a side column or "Year",
+        matching the same group-by on the long frame. Groups are integer
+        codes over the flat GDP values, so no text is repeated.
+        """
+        n_rows, n_years = self.gdp.shape
+        values = pd.Series(np.asarray(self.gdp).ravel(order="F"))
+
+        if group_by == "Year":
+            labels = self.years.astype(int)
+            codes = np.repeat(np.arange(n_years), n_rows)
+        else:
+            labels, inverse = np.unique(self.side[group_by], return_inverse=True)
+            labels = text_category(np.arange(len(labels)), labels)
+            codes = np.tile(inverse, n_years)
+
+        return group_statistics(values, codes, statistics, group_by, labels)
+
+    def aggregate(self, operation: str, group_by: str) -> pd.DataFrame:
+        """Sum or average per group, shaped like process()'s output."""
+        if operation not in AGGREGATIONS:
+            raise ValueError("Invalid operation in config")
+        return self.statistics(group_by, [AGGREGATIONS[operation]]).frame(AGGREGATIONS[operation])
+
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+# ---------- BUILD ----------
+
+def store_directory(file_path: str, root: str = STORE_DIR) -> str:
+    """Store folder of one source file, so different sources never replace each other's store."""
+    return os.path.join(root, cache_name(file_path))
+
+
+def save_matrix_store(cleaned_df: pd.DataFrame, key: dict, directory: str):
+    """
+    Writes the cleaned frame as .npy arrays plus a manifest holding the
+    source key. The store is built in a temporary sibling folder and
+    renamed into place, so readers never see a half-written store and two
+    processes rebuilding at once each swap in a complete one.
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    year_cols = [col for col in cleaned_df.columns if col.isdigit()]
+
+    arrays = {name: cleaned_df[col].to_numpy(dtype=str) for col, name in SIDE_COLS.items()}
+    arrays["years"] = np.array(year_cols, dtype=np.int64)
+    arrays["gdp"] = cleaned_df[year_cols].to_numpy(dtype=np.float64)
+
+    build = tempfile.mkdtemp(prefix=".build-", dir=parent)
+    stale = tempfile.mkdtemp(prefix=".stale-", dir=parent)
+    try:
+        for name, values in arrays.items():
+            np.save(os.path.join(build, name + ".npy"), values)
+        with open(os.path.join(build, "manifest.json"), "w") as file:
+            json.dump({"key": key, "shape": list(arrays["gdp"].shape)}, file)
+
+        # Move the outdated store aside, then rename the new one into its place
+        if os.path.exists(directory):
+            os.replace(directory, os.path.join(stale, "store"))
+        try:
+            os.replace(build, directory)
+        except OSError:
+            # Another process swapped in its own build first; it is just as fresh
+            if not os.path.exists(os.path.join(directory, "manifest.json")):
+                raise
+    finally:
+        shutil.rmtree(build, ignore_errors=True)
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def read_manifest(directory: str):
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def open_matrix_store(file_path: str, cleaned_df: pd.DataFrame = None, root: str = STORE_DIR) -> GDPMatrix:
+    """
+    Opens the memory-mapped store for file_path, rebuilding it first from
+    cleaned_df when it is missing or the source file changed.
+    """
+    directory = store_directory(file_path, root)
+    if not is_fresh(file_path, read_manifest(directory)):
+        if cleaned_df is None:
+            raise FileNotFoundError(f"No up-to-date matrix store for {file_path} in {directory}")
+        save_matrix_store(cleaned_df, file_key(file_path), directory)
+
+    try:
+        return GDPMatrix.open(directory)
+    except FileNotFoundError:
+        # Swapped out by a concurrent rebuild between the check and the open
+        return GDPMatrix.open(directory)
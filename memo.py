@@ -0,0 +1,174 @@
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from transform import LongView
+
+
+# ---------- LRU CACHE ----------
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and by bytes.
+
+    Keys are tuples whose first item is the data version they were
+    computed from, so invalidate(version) drops everything derived from
+    one dataset. hits / misses / evictions count since the last reset.
+    Safe to share between threads; values are computed outside the lock.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, nbytes)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_or_compute(self, key, compute):
+        """Cached value of key, or compute() stored under it."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if entry is not None:
+            value = entry[0]
+        else:
+            value = compute()
+            self.put(key, value)
+        # Callers may modify what they get back; the cached frame stays intact
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def put(self, key, value):
+        nbytes = size_of(value)
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            self.evict()
+
+    def evict(self):
+        with self.lock:
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, nbytes) = self.entries.popitem(last=False)
+                self.bytes -= nbytes
+                self.evictions += 1
+
+    def resize(self, max_entries: int = None, max_bytes: int = None):
+        with self.lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self.evict()
+
+    def invalidate(self, version=None):
+        """Drops entries computed from one data version (None: every entry)."""
+        with self.lock:
+            stale = [key for key in self.entries if version is None or key[0] == version]
+            for key in stale:
+                self.bytes -= self.entries.pop(key)[1]
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.bytes,
+                "max_entries": self.max_entries, "max_bytes": self.max_bytes
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+def size_of(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+
+# Shared cache for aggregation results
+RESULTS = LRUCache()
+
+
+# ---------- DATA VERSIONS ----------
+
+_versions = {}         # id(data) -> version, dropped when data is freed
+_source_versions = {}  # source file -> version currently loaded from it
+
+
+def set_version(data, version: str, source: str = None):
+    """
+    Tags data with a version (e.g. its CSV's content hash). When source
+    was last loaded under another version, that version's results are
+    invalidated: the cleaned data they came from has changed.
+    """
+    if source is not None:
+        previous = _source_versions.get(source)
+        if previous is not None and previous != version:
+            RESULTS.invalidate(previous)
+        _source_versions[source] = version
+    _tag(data, version)
+
+
+def _tag(data, version):
+    if id(data) not in _versions:
+        weakref.finalize(data, _versions.pop, id(data), None)
+    _versions[id(data)] = version
+
+
+def rows_digest(rows: np.ndarray) -> str:
+    """sha256 of a row selection, so two different selections never share cached results."""
+    return hashlib.sha256(rows.dtype.str.encode() + rows.tobytes()).hexdigest()
+
+
+def version_of(data):
+    """Version of the data a frame, view or matrix holds; None when it was never tagged."""
+    if isinstance(data, LongView):
+        wide = version_of(data.wide)
+        if wide is None:
+            return None
+        rows = None if data.rows is None else rows_digest(np.asarray(data.rows))
+        return (wide, rows, tuple(data.year_cols))
+    return _versions.get(id(data))
+
+
+def live_versions() -> set:
+    """Versions tagged on data that is still alive."""
+    return set(_versions.copy().values())
+
+
+# ---------- MEMOIZATION ----------
+
+def memoized(data, query: tuple, compute):
+    """
+    compute() memoized under (version of data, *query) in RESULTS. Only
+    data tagged by set_version is memoized: nothing says when untagged data
+    changes, and its id() may be reused by the next object once it is freed.
+    """
+    version = version_of(data)
+    if version is None:
+        return compute()
+    root = version[0] if isinstance(version, tuple) else version
+    # The root version goes first so invalidate() can find the entry
+    return RESULTS.get_or_compute((root, version) + tuple(query), compute)
+
+
+def cache_stats() -> dict:
+    return RESULTS.stats()
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from cleaner import assemble, check_rows, check_text, duplicated_rows, print_correction_report, value_hashes
+
+# Below this many rows per partition, process start-up costs more than it saves
+MIN_PARTITION_ROWS = 10_000
+
+# Frame being checked; forked workers inherit it instead of unpickling a copy
+_frame = None
+
+
+# ---------- WORKER ----------
+
+def check_partition(part: pd.DataFrame):
+    """Row hashes plus every row check for one partition (runs in a worker)."""
+    masks, text, gdp = check_rows(part)
+    return value_hashes(part), masks, text, gdp
+
+
+def check_shared_slice(job):
+    check, start, stop = job
+    return check(_frame.iloc[start:stop])
+
+
+# ---------- PARTITIONING ----------
+
+def partition_bounds(n_rows: int, workers: int) -> list:
+    n_parts = max(1, min(workers, n_rows // MIN_PARTITION_ROWS))
+    edges = np.linspace(0, n_rows, n_parts + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def map_partitions(check, df: pd.DataFrame, workers: int = None) -> list:
+    """check(partition) for row partitions of df in a process pool, in row order."""
+    workers = workers or os.cpu_count() or 1
+    bounds = partition_bounds(len(df), workers)
+
+    if len(bounds) == 1:
+        return [check(df)]
+    if "fork" in multiprocessing.get_all_start_methods():
+        global _frame
+        _frame = df
+        try:
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=len(bounds), mp_context=context) as pool:
+                return list(pool.map(check_shared_slice, [(check, start, stop) for start, stop in bounds]))
+        finally:
+            _frame = None
+    with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+        return list(pool.map(check, [df.iloc[start:stop] for start, stop in bounds]))
+
+
+def concat_text(parts: list) -> dict:
+    return {col: union_categoricals([part[col] for part in parts], sort_categories=True) for col in parts[0]}
+
+
+def check_rows_parallel(df: pd.DataFrame, workers: int = None):
+    """
+    check_rows over row partitions of df in a process pool.
+
+    Every check only looks at its own row, so the partition results are
+    simply concatenated back in row order. Returns (hashes, masks, text, gdp)
+    with the same values check_rows and value_hashes give on the whole frame.
+    """
+    results = map_partitions(check_partition, df, workers)
+
+    hashes = np.concatenate([r[0] for r in results])
+    masks = {name: np.concatenate([r[1][name] for r in results]) for name in results[0][1]}
+    text = concat_text([r[2] for r in results])
+    gdp = np.asfortranarray(np.concatenate([r[3] for r in results]))
+    return hashes, masks, text, gdp
+
+
+def check_text_parallel(df: pd.DataFrame, workers: int = None):
+    """check_text over row partitions of df in a process pool; same (masks, text)."""
+    results = map_partitions(check_text, df, workers)
+    masks = {name: np.concatenate([r[0][name] for r in results]) for name in results[0][0]}
+    return masks, concat_text([r[1] for r in results])
+
+
+def check_unique_rows_parallel(df: pd.DataFrame, workers: int = None):
+    """
+    Parallel check_rows followed by duplicate removal, found from the
+    workers' row hashes. Returns (unique_df, hashes, masks, text, gdp).
+    """
+    hashes, masks, text, gdp = check_rows_parallel(df, workers)
+
+    unique = ~duplicated_rows(df, hashes)
+    if not unique.all():
+        df, hashes, gdp = df[unique], hashes[unique], gdp[unique]
+        masks = {name: values[unique] for name, values in masks.items()}
+        text = {col: values[unique] for col, values in text.items()}
+
+    return df, hashes, masks, text, gdp
+
+
+# ---------- MAIN ENTRY ----------
+
+def clean_data_parallel(df: pd.DataFrame, workers: int = None):
+    """clean_data with the row checks spread over a process pool; same output and error log."""
+    df, _, masks, text, gdp = check_unique_rows_parallel(df, workers)
+    cleaned, error_log = assemble(df.index, df.columns, masks, text, gdp)
+    print_correction_report(error_log["corrected_gdp"])
+    return cleaned.reset_index(drop=True), error_log
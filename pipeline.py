@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, load_clean_cached, read_cache_meta, is_fresh, data_version
+from cleaner import RULES_VERSION
+from memo import set_version
+from validate_json import validate_json
+from transform import LongView
+from filter_by_country import filter_by_country
+from filter_by_indicator import filter_by_indicator
+from process import aggregate_table, table_frame, country_frames
+
+STAGE_DIR = os.path.join(CACHE_DIR, "stages")
+
+# Stage outputs kept on disk before the least recently used are dropped
+MAX_STAGE_BYTES = 128 * 2**20
+
+# Bump a stage's version whenever its code changes what it returns, so
+# outputs cached by the old code are no longer found
+STAGE_VERSIONS = {"regions": 2, "countries": 2}
+
+# A .tmp file this old belongs to a save that was killed, not one in progress
+STALE_TMP_SECONDS = 3600
+
+
+# ---------- STAGE CACHE ----------
+
+def fingerprint(stage: str, version: str, config_slice: dict) -> str:
+    """
+    Content address of a stage output: data version, stage code version,
+    cleaning rules version and config slice.
+    """
+    key = json.dumps([stage, STAGE_VERSIONS[stage], RULES_VERSION, version, config_slice],
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class StageCache:
+    """
+    Stage outputs as one .npz of arrays per fingerprint. Reading an entry
+    marks it used; past max_bytes the least recently used are deleted.
+    """
+
+    def __init__(self, directory: str = STAGE_DIR, max_bytes: int = MAX_STAGE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key: str):
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                entry = {name: arrays[name] for name in arrays.files}
+        except (OSError, ValueError):
+            return None
+        os.utime(path)  # mtime = last use, for LRU eviction
+        return entry
+
+    def save(self, key: str, arrays: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        # A temp file of its own, so concurrent runs saving one key never share it
+        file = tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False)
+        try:
+            with file:
+                np.savez(file, **arrays)
+            os.replace(file.name, self.path(key))
+        except BaseException:
+            os.remove(file.name)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes temp files left by killed saves, then the least recently
+        used entries past max_bytes. Files a concurrent run deletes first
+        are skipped.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp") and time.time() - stat.st_mtime > STALE_TMP_SECONDS:
+                remove_file(entry.path)
+            elif entry.name.endswith(".npz"):
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            remove_file(path)
+
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ---------- ENCODING ----------
+
+def encode_frames(frames: dict) -> dict:
+    """{key: frame} as flat arrays: keys, column names and one array per frame column."""
+    frames = list(frames.items())
+    columns = list(frames[0][1].columns) if frames else []
+    arrays = {"keys": np.array([key for key, _ in frames]), "columns": np.array(columns, dtype=str)}
+    for i, (_, frame) in enumerate(frames):
+        for col in columns:
+            values = frame[col].to_numpy()
+            arrays[f"{i}:{col}"] = values.astype(str) if values.dtype == object else values
+    return arrays
+
+
+def decode_frames(arrays: dict) -> dict:
+    columns = list(arrays["columns"])
+    return {
+        key.item(): pd.DataFrame({col: arrays[f"{i}:{col}"] for col in columns})
+        for i, key in enumerate(arrays["keys"])
+    }
+
+
+# ---------- RUNNER ----------
+
+def run_pipeline(data_file: str, config: dict, cache: StageCache = None, workers: int = None):
+    """
+    load -> clean -> validate -> transform -> filter -> process, skipping
+    every stage whose fingerprint is unchanged since an earlier run.
+
+    Cleaning reuses the content-hashed clean cache; process outputs are
+    keyed by the CSV's content hash, their code version, the cleaning
+    rules version and only the config keys they read, so changing
+    "operation" re-runs just process. The filter is an index probe,
+    cheaper to rerun than to read back.
+
+    Returns (csv_errors, validated_config, json_errors, region_results,
+    country_data, stats); results are None when the config is invalid.
+    stats lists per stage whether it was cached and how long it took.
+    """
+    cache = cache or StageCache()
+    stats = []
+
+    def record(stage, cached, started):
+        stats.append({"stage": stage, "cached": cached, "seconds": time.perf_counter() - started})
+
+    def cached_stage(stage, config_slice, compute, encode, decode):
+        started = time.perf_counter()
+        key = fingerprint(stage, version, config_slice)
+        entry = cache.load(key)
+        if entry is not None:
+            record(stage, True, started)
+            return decode(entry)
+        result = compute()
+        cache.save(key, encode(result))
+        record(stage, False, started)
+        return result
+
+    # ---------- LOAD + CLEAN ----------
+    started = time.perf_counter()
+    fresh = is_fresh(data_file, read_cache_meta(data_file))
+    cleaned_df, csv_errors = load_clean_cached(data_file, workers=workers)
+    version = data_version(data_file)
+    set_version(cleaned_df, version, source=data_file)
+    record("load+clean", fresh, started)
+
+    # ---------- VALIDATE ----------
+    started = time.perf_counter()
+    validated_config, json_errors = validate_json(config, cleaned_df)
+    record("validate", False, started)
+    if json_errors:
+        return csv_errors, None, json_errors, None, None, stats
+
+    # ---------- TRANSFORM (lazy, nothing to cache) ----------
+    started = time.perf_counter()
+    df_long = filter_by_indicator(LongView(cleaned_df), validated_config)
+    record("transform", False, started)
+
+    countries, years, operation = validated_config["country"], validated_config["year"], validated_config["operation"]
+    indicator = validated_config["indicator"]
+
+    # ---------- FILTER (not cached) ----------
+    started = time.perf_counter()
+    filtered_countries = filter_by_country(df_long, validated_config)
+    record("filter", False, started)
+
+    # ---------- PROCESS ----------
+    def regions():
+        table = aggregate_table(df_long, years, [operation])
+        return {year: table_frame(table, operation, year) for year in years}
+
+    region_results = cached_stage(
+        "regions", {"year": years, "operation": operation, "indicator": indicator}, regions, encode_frames, decode_frames
+    )
+    country_data = cached_stage(
+        "countries", {"country": countries, "operation": operation, "indicator": indicator},
+        lambda: country_frames(filtered_countries, countries, operation), encode_frames, decode_frames
+    )
+
+    return csv_errors, validated_config, json_errors, region_results, country_data, stats
+
+
+def print_stage_stats(stats: list):
+    print("PIPELINE")
+    list(map(
+        lambda stat: print(f"  {stat['stage']:<12} {'cached' if stat['cached'] else 'ran':<7} {stat['seconds'] * 1000:9.2f} ms"),
+        stats
+    ))
@@ -0,0 +1,176 @@
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from cleaner import TEXT_COLS
+from process import AGGREGATIONS
+
+
+# ---------- PLAN ----------
+
+def compile_plan(config: dict) -> dict:
+    """
+    Compiles a validated config into the one query the dashboard needs.
+
+    Region charts compare every continent in the configured years (the
+    configured regions are only highlighted), and country charts follow
+    the configured countries across every year. Predicates are (column,
+    values) terms read as  column IN values. The scan keeps the cells any
+    output reads (its "where" terms OR-ed, within the chosen indicator's
+    rows), then each output groups its own cells by its group_by keys.
+    """
+    outputs = {
+        "regions": {"where": ("Year", list(config["year"])), "group_by": ["Year", "Continent"]},
+        "countries": {"where": ("Country Name", list(config["country"])), "group_by": ["Country Name", "Year"]}
+    }
+    indicators = list(config.get("indicator") or [])
+    return {
+        "years": list(config["year"]),
+        "countries": list(config["country"]),
+        "highlight": list(config["region"]),
+        "operation": config["operation"],
+        "aggregation": AGGREGATIONS[config["operation"]],
+        "where": {
+            "any": [output["where"] for output in outputs.values()],
+            "all": [("Indicator", indicators)] if indicators else []
+        },
+        "outputs": outputs
+    }
+
+
+def describe(term: tuple) -> str:
+    column, values = term
+    return f"{column} IN {values}"
+
+
+def explain(plan: dict, stats: list = None) -> str:
+    """Readable plan, plus per-step row counts and timings once it has run."""
+    where = " OR ".join(map(describe, plan["where"]["any"]))
+    if plan["where"]["all"]:
+        where = " AND ".join([f"({where})"] + list(map(describe, plan["where"]["all"])))
+
+    lines = [
+        "QUERY PLAN",
+        f"  {'scan':<10} wide cleaned frame, one GDP block",
+        f"  {'where':<10} {where}",
+    ]
+    for name, output in plan["outputs"].items():
+        lines.append(
+            f"  {name:<10} {plan['aggregation']}(GDP) WHERE {describe(output['where'])} "
+            f"GROUP BY {', '.join(output['group_by'])}"
+        )
+    lines.append(f"  {'highlight':<10} Continent IN {plan['highlight']} (charts only)")
+
+    if stats:
+        lines.append("STEPS")
+        lines += [
+            f"  {step['step']:<10} {step['rows_in']:>12,} -> {step['rows_out']:>10,} rows  {step['seconds'] * 1000:8.2f} ms"
+            for step in stats
+        ]
+    return "\n".join(lines)
+
+
+# ---------- PREDICATES ----------
+
+def term_mask(term: tuple, cleaned_df: pd.DataFrame, year_cols: list) -> np.ndarray:
+    """
+    Cells matching one term, as a (1, years) mask for "Year" or a (rows, 1)
+    mask for a text column, either broadcasting over the GDP block.
+    "Indicator" matches indicator codes and names.
+    """
+    column, values = term
+    if column == "Year":
+        return np.isin(year_cols, [str(value) for value in values])[None, :]
+    if column == "Indicator":
+        rows = cleaned_df["Indicator Code"].isin(values) | cleaned_df["Indicator Name"].isin(values)
+    else:
+        rows = cleaned_df[column].isin(values)
+    return rows.to_numpy(dtype=bool)[:, None]
+
+
+def where_mask(where: dict, cleaned_df: pd.DataFrame, year_cols: list) -> np.ndarray:
+    """rows x years mask of the plan's predicate: any of where["any"], and all of where["all"]."""
+    mask = np.zeros((len(cleaned_df), len(year_cols)), dtype=bool)
+    mask = reduce(np.logical_or, (term_mask(term, cleaned_df, year_cols) for term in where["any"]), mask)
+    return reduce(np.logical_and, (term_mask(term, cleaned_df, year_cols) for term in where["all"]), mask)
+
+
+def group_keys(column: str, cleaned_df: pd.DataFrame, years: np.ndarray, rows, cols) -> tuple:
+    """(codes of the matched cells, labels) of one group-by column; -1 codes are missing values."""
+    if column == "Year":
+        return cols, years
+    if isinstance(cleaned_df[column].dtype, pd.CategoricalDtype):
+        codes, labels = cleaned_df[column].cat.codes.to_numpy(), cleaned_df[column].cat.categories.to_numpy()
+    else:
+        codes, labels = pd.factorize(cleaned_df[column])
+    return codes[rows], np.asarray(labels)
+
+
+# ---------- EXECUTION ----------
+
+def run_plan(plan: dict, cleaned_df: pd.DataFrame):
+    """
+    Runs the plan over the wide cleaned frame in one pass: one mask from
+    the plan's predicate, one gather of the matched GDP cells, then one
+    group-by per output on its group_by keys.
+
+    Returns (results, stats): results["regions"] maps each year to its
+    per-continent frame and results["countries"] each country to its
+    per-year frame, the same frames process() and prepare_country_data
+    build from the long data. stats lists rows in/out and time per step,
+    counted on the cells each step actually matched.
+    """
+    stats = []
+
+    def step(name, rows_in, rows_out, started):
+        stats.append({
+            "step": name, "rows_in": int(rows_in), "rows_out": int(rows_out),
+            "seconds": time.perf_counter() - started
+        })
+
+    # ---------- SCAN (fused predicate) ----------
+    started = time.perf_counter()
+    year_cols = [col for col in cleaned_df.columns if col not in TEXT_COLS]
+    years = np.array(year_cols, dtype=int)
+
+    mask = where_mask(plan["where"], cleaned_df, year_cols)
+    rows, cols = np.nonzero(mask)
+    values = cleaned_df[year_cols].to_numpy(dtype=float)[rows, cols]
+    step("scan", mask.size, len(values), started)
+
+    # ---------- GROUP BY (per output) ----------
+    def grouped(name, output):
+        started = time.perf_counter()
+        cells = term_mask(output["where"], cleaned_df, year_cols)
+        cells = cells[0, cols] if cells.shape[0] == 1 else cells[rows, 0]
+
+        keys = [group_keys(column, cleaned_df, years, rows, cols) for column in output["group_by"]]
+        cells &= reduce(np.logical_and, (codes >= 0 for codes, _ in keys))
+        flat = np.ravel_multi_index([codes[cells] for codes, _ in keys], [len(labels) for _, labels in keys])
+
+        result = pd.Series(values[cells]).groupby(flat).agg(plan["aggregation"])
+        codes = np.unravel_index(result.index.to_numpy(), [len(labels) for _, labels in keys])
+        step(name, cells.sum(), len(result), started)
+        return [labels[group] for group, (_, labels) in zip(codes, keys)], result.to_numpy()
+
+    def nested(name, output) -> dict:
+        # {first key: frame of second key + GDP}, e.g. {year: Continent, GDP}
+        (outer, inner), gdp = grouped(name, output)
+        column = output["group_by"][1]
+        return {
+            key: pd.DataFrame({column: inner[outer == key], "GDP": gdp[outer == key]})
+            for key in pd.unique(outer)
+        }
+
+    regions = nested("regions", plan["outputs"]["regions"])
+    countries = nested("countries", plan["outputs"]["countries"])
+
+    empty_region = pd.DataFrame({"Continent": np.empty(0, dtype=object), "GDP": np.empty(0)})
+    empty_country = pd.DataFrame({"Year": np.empty(0, dtype=int), "GDP": np.empty(0)})
+    results = {
+        "regions": {year: regions.get(year, empty_region) for year in plan["years"]},
+        "countries": {country: countries.get(country, empty_country) for country in plan["countries"]}
+    }
+    return results, stats
@@ -1,25 +1,113 @@
 import pandas as pd
+from matrix_store import GDPMatrix
+from transform import LongView
+from cube import DataCube
+from aggregate import AGGREGATIONS, STATISTICS, AggregateResult, group_statistics
+from memo import memoized
+from profiler import profiled
 
+@profiled
 def process(df: pd.DataFrame, config: dict, group_by: str) -> pd.DataFrame:
     """
     Aggregates GDP based on JSON operation (sum / average)
     and groups by the specified column.
     
     Parameters:
-    df        : filtered DataFrame
+    df        : filtered DataFrame (or GDPMatrix / LongView slice, or a
+                DataCube, sliced to config's "indicator" first)
     config    : validated JSON config
     group_by  : column to group by (e.g., 'Continent', 'Year')
     """
 
     operation = config["operation"]
+    if operation not in AGGREGATIONS:
+        raise ValueError("Invalid operation in config")
+
+    # Memoized per (data version, statistic, indicator, group_by)
+    statistic = AGGREGATIONS[operation]
+    indicator = config.get("indicator")
+    query = ("process", statistic, tuple(indicator) if isinstance(indicator, list) else indicator, group_by)
+    return memoized(df, query, lambda: aggregate_statistics(df, group_by, [statistic], indicator).frame(statistic))
+
+
+@profiled
+def country_frames(df, countries: list, operation: str) -> dict:
+    """
+    {country: per-year GDP frame} for each country, aggregated with the
+    operation; memoized per (data version, country, statistic).
+    """
+    aggregate_func = AGGREGATIONS[operation]
+
+    def country_frame(country):
+        if isinstance(df, (GDPMatrix, LongView)):
+            return aggregate_statistics(df.select(countries=[country]), "Year", [aggregate_func]).frame(aggregate_func)
+        return (
+            df[df["Country Name"] == country]
+            .groupby("Year")["GDP"]
+            .agg(aggregate_func)
+            .reset_index()
+        )
+
+    return dict(map(
+        lambda country: (country, memoized(df, ("country", country, aggregate_func), lambda: country_frame(country))),
+        countries
+    ))
+
+
+def aggregate_statistics(df, group_by: str, statistics=STATISTICS, indicator=None) -> AggregateResult:
+    """
+    Any subset of count, sum, mean, min, max, std and median of GDP per
+    group_by, from one grouped pass. Same inputs as process().
+    """
+    if isinstance(df, DataCube):
+        df = df.indicator(indicator)
+    if isinstance(df, GDPMatrix):
+        return df.statistics(group_by, statistics)
+    if isinstance(df, LongView):
+        df = df.to_long()  # melts only the selected slice
+
+    # observed=True inside: only groups present in df, even for categorical columns
+    return group_statistics(df["GDP"], df[group_by], statistics)
+
 
-    grouped = df.groupby(group_by)["GDP"]
+@profiled
+def aggregate_table(df, years: list, operations: list, group_by: str = "Continent") -> pd.DataFrame:
+    """
+    group_by x (operation, year) table of GDP aggregates, computed with one
+    grouped reduction for every requested year and operation.
+
+    Each cell equals process() on that year's slice, so per-year charts can
+    read columns from the table instead of re-filtering and regrouping.
+    Tables are memoized per data version and query.
+    """
+    query = ("table", tuple(years), tuple(operations), group_by)
+    return memoized(df, query, lambda: build_table(df, years, operations, group_by))
 
-    if operation == "sum":
-        result_df = grouped.sum().reset_index(name="GDP")
-    elif operation == "average":
-        result_df = grouped.mean().reset_index(name="GDP")
+
+def build_table(df, years: list, operations: list, group_by: str) -> pd.DataFrame:
+    funcs = [AGGREGATIONS[operation] for operation in operations]
+
+    if isinstance(df, (LongView, GDPMatrix)):
+        # Wide layouts: year columns are already side by side
+        view = df.select(years=years)
+        if isinstance(view, GDPMatrix):
+            block = pd.DataFrame(view.gdp, columns=view.years.astype(int))
+            keys = view.side[group_by]
+        else:
+            rows = view.row_positions()
+            block = view.wide.iloc[rows][view.year_cols].set_axis([int(col) for col in view.year_cols], axis=1)
+            block = block.reset_index(drop=True)
+            keys = view.wide[group_by].iloc[rows].reset_index(drop=True)
+        table = block.groupby(keys, observed=True).agg(funcs).swaplevel(axis=1)
     else:
-        raise ValueError("Invalid operation in config")
+        long = df[df["Year"].isin(years)]
+        table = long.groupby([group_by, "Year"], observed=True)["GDP"].agg(funcs).unstack("Year")
+
+    table = table.rename(columns=dict(zip(funcs, operations)), level=0)
+    table.index.name = group_by
+    return table
+
 
-    return result_df
+def table_frame(table: pd.DataFrame, operation: str, year: int) -> pd.DataFrame:
+    """One year of an aggregate_table, shaped like process()'s output."""
+    return pd.DataFrame({table.index.name: table.index.to_numpy(), "GDP": table[(operation, year)].to_numpy()})
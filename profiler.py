@@ -0,0 +1,148 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Setting this to a file path profiles the run and writes its trace there
+ENV_VAR = "GDP_PROFILE"
+
+# Recorded spans while profiling, None while it is off
+_events = None
+_stack = []  # open spans: [start tracemalloc size, peak so far]
+_origin = 0.0
+
+
+# ---------- SWITCH ----------
+
+def enable():
+    global _events, _origin
+    _events = []
+    _stack.clear()
+    _origin = time.perf_counter()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable() -> list:
+    """Stops profiling; returns the recorded spans."""
+    global _events
+    events, _events = _events or [], None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return events
+
+
+def is_enabled() -> bool:
+    return _events is not None
+
+
+# ---------- SPANS ----------
+
+def rows_of(value):
+    """Row (or cell) count of a frame, view, matrix, dict of frames or tuple led by one."""
+    if isinstance(value, tuple) and value:
+        return rows_of(value[0])
+    if isinstance(value, dict):
+        counts = [rows_of(item) for item in value.values()]
+        return sum(counts) if counts and None not in counts else None
+    try:
+        return len(value) if hasattr(value, "shape") or hasattr(value, "to_long") else None
+    except TypeError:
+        return None
+
+
+def profiled(func):
+    """
+    Records wall time, CPU time, peak traced allocation and input/output
+    rows of every call while profiling is on; otherwise one None check.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _events is None:
+            return func(*args, **kwargs)
+
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            _stack[-1][1] = max(_stack[-1][1], peak)  # outer span's peak before this one resets it
+        tracemalloc.reset_peak()
+        _stack.append([current, current])
+
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+            span = _stack.pop()
+            span[1] = max(span[1], tracemalloc.get_traced_memory()[1])
+            if _stack:
+                _stack[-1][1] = max(_stack[-1][1], span[1])
+
+        _events.append({
+            "name": func.__qualname__, "module": func.__module__,
+            "start": started - _origin, "wall": wall, "cpu": cpu,
+            "peak_bytes": span[1] - span[0],
+            "rows_in": rows_of(args[0]) if args else None, "rows_out": rows_of(result)
+        })
+        return result
+
+    return wrapper
+
+
+# ---------- OUTPUT ----------
+
+def chrome_trace(events: list) -> dict:
+    """Spans as Chrome trace "complete" events (chrome://tracing, Perfetto)."""
+    pid, tid = os.getpid(), threading.get_ident()
+    return {
+        "traceEvents": [
+            {
+                "name": event["name"], "cat": event["module"], "ph": "X", "pid": pid, "tid": tid,
+                "ts": event["start"] * 1e6, "dur": event["wall"] * 1e6,
+                "args": {key: event[key] for key in ("cpu", "peak_bytes", "rows_in", "rows_out")}
+            }
+            for event in events
+        ],
+        "displayTimeUnit": "ms"
+    }
+
+
+def write_trace(events: list, path: str):
+    with open(path, "w") as file:
+        json.dump(chrome_trace(events), file)
+
+
+def print_summary(events: list):
+    """Per function: calls, total wall and CPU time, largest peak allocation, last row counts."""
+    by_name = {}
+    for event in events:
+        by_name.setdefault(event["name"], []).append(event)
+
+    print("\n" + "="*88)
+    print(f"{'function':<28} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>9} {'rows in':>11} {'rows out':>11}")
+    print("-"*88)
+    for name, calls in sorted(by_name.items(), key=lambda item: -sum(e["wall"] for e in item[1])):
+        last = calls[-1]
+        print(
+            f"{name:<28} {len(calls):>6} {sum(e['wall'] for e in calls) * 1000:>10.2f} "
+            f"{sum(e['cpu'] for e in calls) * 1000:>10.2f} {max(e['peak_bytes'] for e in calls) / 2**20:>9.2f} "
+            f"{'-' if last['rows_in'] is None else format(last['rows_in'], ','):>11} "
+            f"{'-' if last['rows_out'] is None else format(last['rows_out'], ','):>11}"
+        )
+    print("="*88 + "\n")
+
+
+def finish(path: str):
+    """Stops profiling, writes the trace to path and prints the summary."""
+    events = disable()
+    write_trace(events, path)
+    print_summary(events)
+    print(f"Trace written to {path}")
+
+
+# Profiling from the environment covers any entry point
+if os.environ.get(ENV_VAR):
+    enable()
+    atexit.register(lambda: is_enabled() and finish(os.environ[ENV_VAR]))
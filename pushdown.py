@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import (
+    TEXT_COLS, check_rows, clean_frame, concat_cleaned, duplicated_rows, error_log_of,
+    print_correction_report
+)
+from validate_json import validate_json
+from vocabulary import Vocabulary
+
+# Rows parsed at a time by the full-row checks
+CHUNK_ROWS = 100_000
+
+
+# ---------- HELPERS ----------
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def read_header(file_path: str) -> list:
+    """Column names of the CSV without parsing any data rows."""
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
+def pushdown_columns(header: list, config: dict) -> list:
+    """Text columns plus only the year columns the config asks for."""
+    wanted_years = {str(year) for year in as_list(config.get("year"))}
+    return [col for col in header if col in TEXT_COLS or col in wanted_years]
+
+
+def slice_hashes(text: dict, gdp: np.ndarray) -> np.ndarray:
+    """
+    64-bit hash of every row over the values check_rows already converted.
+
+    Rows a full load calls duplicates always share it. Invalid GDP text is
+    0.0 here, so a few different rows share it too: confirm_duplicates
+    settles those on the parsed rows.
+    """
+    hashes = np.full(len(gdp), 0x345678, dtype=np.uint64)
+    for values in [*text.values(), *(gdp + 0.0).T]:  # -0.0 == 0.0
+        hashes = hashes * np.uint64(1000003) ^ pd.util.hash_array(values)
+    return hashes
+
+
+def confirm_duplicates(file_path: str, hashes: np.ndarray, text_typed: set) -> np.ndarray:
+    """
+    Flags rows that repeat an earlier row, with the same test as the
+    cleaner's duplicated_rows on a full load: rows sharing a row hash are
+    re-read and compared on their parsed values. Columns that held text
+    anywhere in the file are read as text, as a full load would.
+    """
+    duplicated = np.zeros(len(hashes), dtype=bool)
+    candidates = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    if candidates.any():
+        lines = set(np.flatnonzero(candidates) + 1)
+        rows = pd.read_csv(file_path, skiprows=lambda line: line != 0 and line not in lines,
+                           dtype=dict.fromkeys(text_typed, str))
+        duplicated[candidates] = duplicated_rows(rows)
+    return duplicated
+
+
+def cleaned_slice(columns: list, text: dict, gdp: np.ndarray, gdp_cols: list, rows=slice(None)) -> pd.DataFrame:
+    """The given columns and rows of a chunk, from the values check_rows converted."""
+    wanted = [col for col in gdp_cols if col in columns]
+    gdp_part = gdp[rows][:, [gdp_cols.index(col) for col in wanted]]
+    text_part = {col: values[rows] for col, values in text.items()}
+    return pd.concat([pd.DataFrame(text_part), pd.DataFrame(gdp_part, columns=wanted)], axis=1)[columns]
+
+
+def kept_rows(parts: list, keep: np.ndarray) -> pd.DataFrame:
+    """Concatenated slices restricted to the kept rows, categories as a full load leaves them."""
+    cleaned = concat_cleaned(parts)[keep].reset_index(drop=True)
+    for col in TEXT_COLS:
+        cleaned[col] = cleaned[col].cat.remove_unused_categories()
+    return cleaned
+
+
+# ---------- PUSHDOWN SCAN ----------
+
+def load_pushdown(file_path: str, config: dict, chunksize: int = CHUNK_ROWS):
+    """
+    One streaming pass over the CSV that keeps only the slices the config
+    needs:
+
+    region_df  : every kept row, but only the text columns and configured
+                 years (region charts compare all continents for those years)
+    country_df : every column, but only the kept rows of configured countries
+                 (country charts plot each country across all years)
+
+    Every row check (duplicates included) is still judged on the whole row,
+    so the error log and the kept rows are exactly those of a full load and
+    every row is still parsed once. What shrinks is what is held: a chunk
+    at a time, then only the slices, as converted values. Returns
+    (region_df, country_df, error_log, header).
+    """
+    countries = as_list(config.get("country"))
+    region_parts, country_parts, country_rows, mask_parts, hash_parts = [], [], [], [], []
+    text_typed = set()
+    header = None
+
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        header = header or list(chunk.columns)
+        gdp_cols = [col for col in header if col not in TEXT_COLS]
+        masks, text, gdp = check_rows(chunk)
+        mask_parts.append(masks)
+        hash_parts.append(slice_hashes(text, gdp))
+        text_typed |= {col for col in gdp_cols if not pd.api.types.is_numeric_dtype(chunk[col])}
+
+        rows = np.asarray(text["Country Name"].isin(countries))
+        region_parts.append(cleaned_slice(pushdown_columns(header, config), text, gdp, gdp_cols))
+        country_parts.append(cleaned_slice(header, text, gdp, gdp_cols, rows))
+        country_rows.append(chunk.index[rows])
+
+    if header is None:
+        header = read_header(file_path)
+        empty, error_log = clean_frame(pd.DataFrame(columns=header))
+        return empty[pushdown_columns(header, config)], empty, error_log, header
+
+    # ---------- FULL-ROW CHECKS ----------
+    duplicated = confirm_duplicates(file_path, np.concatenate(hash_parts), text_typed)
+    masks = {name: np.concatenate([part[name] for part in mask_parts])[~duplicated] for name in mask_parts[0]}
+    index = pd.RangeIndex(len(duplicated))[~duplicated]
+    error_log, removed = error_log_of(index, masks)
+    keep = np.zeros(len(duplicated), dtype=bool)
+    keep[index[~removed]] = True
+
+    region_df = kept_rows(region_parts, keep)
+    country_df = kept_rows(country_parts, keep[np.concatenate(country_rows)])
+    return region_df, country_df, error_log, header
+
+
+# ---------- MAIN ENTRY ----------
+
+def clean_and_validate_pushdown(file_path: str, config: dict):
+    """
+    Pushdown equivalent of load + clean + validate in main.
+
+    Returns (region_clean, country_clean, csv_errors, validated_config, json_errors).
+    The CSV error report and the kept rows are those of a full load.
+    """
+    region_clean, country_clean, csv_errors, header = load_pushdown(file_path, config)
+    print_correction_report(csv_errors["corrected_gdp"])
+
+    # region_clean holds every kept row, so its names are the full vocabulary
+    vocabulary = Vocabulary.from_frame(region_clean, header)
+    validated_config, json_errors = validate_json(config, vocabulary=vocabulary)
+
+    return region_clean, country_clean, csv_errors, validated_config, json_errors
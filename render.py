@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+from matplotlib.widgets import Button
+
+# File formats a headless run can write
+FORMATS = ["png", "svg", "pdf"]
+
+# Drop creation dates so re-rendering the same chart gives the same file
+METADATA = {"png": {}, "svg": {"Date": None}, "pdf": {"CreationDate": None}}
+
+# rcParams a render worker must not take over from the parent
+PROCESS_PARAMS = {"backend", "backend_fallback", "interactive"}
+
+# Headless output settings, None while charts open in windows
+_headless = None
+
+# Render workers (None: charts render in this process), chart outputs in
+# submission order (written paths, or futures of them) and paths written
+# by the chart currently rendering here
+_pool = None
+_outputs = []
+_written = []
+
+
+# ---------- MODE ----------
+
+def set_headless(out_dir: str, formats=("png",)):
+    """
+    Renders every chart to out_dir/<name>.<format> on the non-interactive
+    Agg backend instead of showing it in a window.
+    """
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown chart formats: {unknown}. Choose from {FORMATS}")
+
+    global _headless
+    if plt.get_backend().lower() != "agg":
+        plt.switch_backend("Agg")
+    plt.rcParams["svg.hashsalt"] = "gdp-dashboard"  # stable SVG element ids
+    os.makedirs(out_dir, exist_ok=True)
+    _headless = {"dir": out_dir, "formats": list(formats)}
+
+
+def set_interactive():
+    global _headless
+    _headless = None
+
+
+def is_headless() -> bool:
+    return _headless is not None
+
+
+@contextmanager
+def headless_folder(name: str):
+    """
+    Headless charts drawn inside the block go to a sub-folder of the output
+    folder, so dashboards drawn one after another (one per indicator) keep
+    their own files under the same chart names. No-op for windows.
+    """
+    global _headless
+    previous = _headless
+    if previous is not None:
+        set_headless(os.path.join(previous["dir"], name.replace(os.sep, "_")), previous["formats"])
+    try:
+        yield
+    finally:
+        _headless = previous
+
+
+# ---------- OUTPUT ----------
+
+def show_figure(fig, name: str, maximize=None) -> list:
+    """
+    Interactive: adds the "Next →" button, maximizes the window and blocks
+    until the figure is closed. Headless: writes fig as name.<format> for
+    every configured format and closes it. Returns the written paths.
+    """
+    if _headless is None:
+        ax_button = fig.add_axes([0.02, 0.02, 0.1, 0.05])
+        btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
+        btn.label.set_color('black')
+        btn.label.set_fontweight('bold')
+        btn.on_clicked(lambda event: plt.close(fig))
+
+        if maximize is not None:
+            maximize()
+        plt.show()
+        return []
+
+    paths = [os.path.join(_headless["dir"], f"{name}.{fmt}") for fmt in _headless["formats"]]
+    for path, fmt in zip(paths, _headless["formats"]):
+        fig.savefig(path, format=fmt, metadata=METADATA[fmt])
+    plt.close(fig)
+    _written.extend(paths)
+    return paths
+
+
+# ---------- SCHEDULER ----------
+
+def set_render_workers(workers: int = None):
+    """
+    Renders headless charts over this many worker processes, each on its
+    own Agg backend (None or 1: in this process, one after another).
+    """
+    global _pool
+    close_render_pool()
+    if workers and workers > 1:
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def render_chart(chart, *args):
+    """
+    Draws chart(*args). Headless charts go to the render pool when there is
+    one, together with the current rcParams and output folder, so a worker
+    draws exactly what this process would; everything else runs here.
+    """
+    if _headless is None:
+        chart(*args)
+    elif _pool is None:
+        _outputs.append(render_job(chart, args))
+    else:
+        params = {key: value for key, value in plt.rcParams.items() if key not in PROCESS_PARAMS}
+        _outputs.append(_pool.submit(render_job, chart, args, params, _headless))
+
+
+def render_job(chart, args, params=None, headless=None) -> list:
+    """Renders one chart in this process; returns the files it wrote."""
+    global _written
+    if headless is not None:
+        set_headless(headless["dir"], headless["formats"])
+    if params is not None:
+        plt.rcParams.update(params)
+
+    _written = []
+    chart(*args)
+    return _written
+
+
+def wait_charts() -> list:
+    """Waits for every submitted chart; returns the written files in submission order."""
+    outputs = [output if isinstance(output, list) else output.result() for output in _outputs]
+    _outputs.clear()
+    return [path for paths in outputs for path in paths]
+
+
+def close_render_pool() -> list:
+    global _pool
+    paths = wait_charts()
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+    return paths
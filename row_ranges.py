@@ -0,0 +1,127 @@
+import numpy as np
+
+
+# ---------- ROW RANGES ----------
+
+class RowRanges:
+    """
+    Sorted set of row numbers stored as runs of consecutive rows.
+
+    A dirty file with millions of flagged rows usually has them in long
+    runs, so a category costs two int64 arrays (run starts and stops,
+    stop exclusive) instead of one Python int per row. Iterating still
+    yields every row number in order.
+    """
+
+    def __init__(self, starts=(), stops=()):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from row numbers in any order; duplicates are dropped."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) and np.any(rows[1:] <= rows[:-1]):
+            rows = np.unique(rows)
+        if not len(rows):
+            return cls()
+
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        starts = rows[np.r_[0, breaks]]
+        stops = rows[np.r_[breaks - 1, len(rows) - 1]] + 1
+        return cls(starts, stops)
+
+    @classmethod
+    def union(cls, *ranges):
+        """All rows in any of the given RowRanges."""
+        starts = np.concatenate([r.starts for r in ranges] or [np.empty(0, np.int64)])
+        stops = np.concatenate([r.stops for r in ranges] or [np.empty(0, np.int64)])
+        if not len(starts):
+            return cls()
+
+        order = np.argsort(starts, kind="stable")
+        starts, stops = starts[order], np.maximum.accumulate(stops[order])
+
+        # A run starts a new range only if it begins after every earlier run ends
+        new = np.r_[True, starts[1:] > stops[:-1]]
+        ends = np.r_[np.flatnonzero(new)[1:] - 1, len(starts) - 1]
+        return cls(starts[new], stops[ends])
+
+    # ---------- ACCESS ----------
+
+    def __len__(self):
+        return int((self.stops - self.starts).sum())
+
+    def __bool__(self):
+        return len(self.starts) > 0
+
+    def __iter__(self):
+        for start, stop in zip(self.starts.tolist(), self.stops.tolist()):
+            yield from range(start, stop)
+
+    def __eq__(self, other):
+        if isinstance(other, RowRanges):
+            return np.array_equal(self.starts, other.starts) and np.array_equal(self.stops, other.stops)
+        try:
+            return np.array_equal(self.to_array(), np.asarray(other))
+        except (TypeError, ValueError):
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RowRanges({self.format()})"
+
+    def to_array(self) -> np.ndarray:
+        if not len(self.starts):
+            return np.empty(0, dtype=np.int64)
+        lengths = self.stops - self.starts
+        offsets = np.repeat(self.starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def tolist(self) -> list:
+        return self.to_array().tolist()
+
+    def head(self, n: int) -> list:
+        """First n row numbers."""
+        rows = []
+        for start, stop in zip(self.starts.tolist(), self.stops.tolist()):
+            rows.extend(range(start, min(stop, start + n - len(rows))))
+            if len(rows) >= n:
+                break
+        return rows
+
+    # ---------- FORMAT ----------
+
+    def range_strings(self, limit: int = None) -> list:
+        """Runs as "120-4500" (or "7" for a single row), at most limit of them."""
+        starts, stops = self.starts[:limit].tolist(), self.stops[:limit].tolist()
+        return [
+            str(start) if stop - start == 1 else f"{start}-{stop - 1}"
+            for start, stop in zip(starts, stops)
+        ]
+
+    def format(self, max_ranges: int = 10) -> str:
+        text = ", ".join(self.range_strings(max_ranges))
+        hidden = len(self.starts) - max_ranges
+        return text + (f", … (+{hidden} more ranges)" if hidden > 0 else "")
+
+    # ---------- SERIALIZATION ----------
+
+    def to_json(self) -> list:
+        return np.column_stack([self.starts, self.stops]).tolist()
+
+    @classmethod
+    def from_json(cls, pairs):
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        return cls(pairs[:, 0], pairs[:, 1])
+
+
+def write_error_log(error_log: dict, path: str):
+    """Writes every flagged row of every category, as ranges, to a text file."""
+    with open(path, "w") as file:
+        for error_type, rows in error_log.items():
+            file.write(f"[{error_type}] {len(rows)} rows\n")
+            for text in rows.range_strings():
+                file.write(text + "\n")
+            file.write("\n")
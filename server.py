@@ -0,0 +1,320 @@
+import base64
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from cache import load_clean_cached, data_version
+from memo import RESULTS, set_version, cache_stats
+from transform import LongView
+from vocabulary import vocabulary_of
+from validate_json import validate_json
+from filter_by_country import filter_by_country
+from filter_by_indicator import filter_by_indicator
+from process import aggregate_table, table_frame, country_frames
+
+# Latencies kept per endpoint for the percentiles in /metrics
+LATENCY_WINDOW = 2048
+
+# Requests finished within this many seconds count towards the recent throughput
+THROUGHPUT_WINDOW = 60.0
+
+# Largest accepted request body
+MAX_BODY_BYTES = 1 * 2**20
+
+
+# ---------- DATASET ----------
+
+class Dataset:
+    """
+    One cleaned CSV with everything queries share: the lazy long view with
+    its lookup indexes built, the validation vocabulary and the version
+    memoized results are keyed by. Never modified once loaded.
+    """
+
+    def __init__(self, data_file: str, workers: int = None):
+        started = time.perf_counter()
+        self.data_file = data_file
+        self.cleaned_df, self.csv_errors = load_clean_cached(data_file, workers=workers)
+        self.version = data_version(data_file)
+        set_version(self.cleaned_df, self.version, source=data_file)
+
+        self.df_long = LongView(self.cleaned_df)
+        # Built now, so concurrent first queries don't each build them
+        self.df_long.index("Country Name")
+        self.df_long.index("Continent")
+        self.df_long.index("Indicator Code")
+        self.df_long.index("Indicator Name")
+        self.vocabulary = vocabulary_of(self.cleaned_df)
+
+        self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - started
+
+    def describe(self) -> dict:
+        return {
+            "data_file": self.data_file, "version": self.version,
+            "rows": len(self.cleaned_df), "csv_errors": sum(map(len, self.csv_errors.values())),
+            "loaded_at": self.loaded_at, "load_seconds": round(self.load_seconds, 4)
+        }
+
+
+# ---------- METRICS ----------
+
+class Metrics:
+    """Request counts, errors, in-flight requests and latency percentiles per endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+        self.in_flight = 0
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self, endpoint: str, seconds: float, failed: bool):
+        with self.lock:
+            self.in_flight -= 1
+            stats = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "errors": 0, "seconds": 0.0,
+                "latencies": deque(maxlen=LATENCY_WINDOW), "finished": deque(maxlen=LATENCY_WINDOW)
+            })
+            stats["requests"] += 1
+            stats["errors"] += failed
+            stats["seconds"] += seconds
+            stats["latencies"].append(seconds)
+            stats["finished"].append(time.time())
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            now = time.time()
+            uptime = now - self.started
+
+            def summary(stats):
+                latencies = np.array(stats["latencies"]) * 1000
+                recent = sum(finished >= now - THROUGHPUT_WINDOW for finished in stats["finished"])
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+                return {
+                    "requests": stats["requests"], "errors": stats["errors"],
+                    "mean_ms": round(stats["seconds"] * 1000 / stats["requests"], 3),
+                    "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+                    "max_ms": round(latencies.max(), 3) if len(latencies) else 0.0,
+                    "throughput_rps": round(stats["requests"] / uptime, 3) if uptime else 0.0,
+                    "recent_rps": round(recent / min(uptime, THROUGHPUT_WINDOW), 3) if uptime else 0.0
+                }
+
+            return {
+                "uptime_seconds": round(uptime, 3), "in_flight": self.in_flight,
+                "requests": sum(stats["requests"] for stats in self.endpoints.values()),
+                "endpoints": {name: summary(stats) for name, stats in self.endpoints.items()}
+            }
+
+
+# ---------- QUERIES ----------
+
+def frame_records(frame) -> list:
+    """Rows of a frame as JSON-ready dicts, missing values as null."""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+def run_query(dataset: Dataset, config, chart_formats=None) -> tuple:
+    """
+    (status, response) for one dashboard config against dataset: the
+    validation errors, or the per-year continent aggregates and per-country
+    yearly aggregates, plus base64 chart files when chart_formats is given.
+    """
+    validated_config, json_errors = validate_json(config, vocabulary=dataset.vocabulary)
+    if json_errors:
+        return 400, {"version": dataset.version, "errors": json_errors}
+
+    years, operation = validated_config["year"], validated_config["operation"]
+    df_long = filter_by_indicator(dataset.df_long, validated_config)
+    table = aggregate_table(df_long, years, [operation])
+    region_results = {year: table_frame(table, operation, year) for year in years}
+    country_data = country_frames(
+        filter_by_country(df_long, validated_config), validated_config["country"], operation
+    )
+
+    response = {
+        "version": dataset.version,
+        "config": validated_config,
+        "regions": {str(year): frame_records(frame) for year, frame in region_results.items()},
+        "countries": {country: frame_records(frame) for country, frame in country_data.items()}
+    }
+    if chart_formats:
+        response["charts"] = render_charts(validated_config, region_results, country_data, chart_formats)
+    return 200, response
+
+
+# pyplot and the headless render settings are process-wide: one chart set at a time
+_chart_lock = threading.Lock()
+
+
+def render_charts(validated_config: dict, region_results: dict, country_data: dict, chart_formats) -> dict:
+    """{file name: base64 bytes} of the dashboard's charts rendered headless."""
+    from render import set_headless, set_interactive
+    from visualize_regions import visualize_regions
+    from visualize_countries import visualize_countries
+
+    with _chart_lock, tempfile.TemporaryDirectory() as chart_dir:
+        set_headless(chart_dir, chart_formats)
+        try:
+            # The chart functions also print their summaries; a response has no terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                visualize_regions(None, validated_config, region_results)
+                visualize_countries(None, validated_config, country_data)
+        finally:
+            # The folder is deleted on exit, so later charts must not be sent there
+            set_interactive()
+
+        def encode(name):
+            with open(os.path.join(chart_dir, name), "rb") as file:
+                return name, base64.b64encode(file.read()).decode("ascii")
+
+        return dict(map(encode, sorted(os.listdir(chart_dir))))
+
+
+# ---------- SERVICE ----------
+
+class QueryService:
+    """
+    The resident dataset plus metrics. Each request reads self.dataset once,
+    so it runs entirely against one version; reload() builds the new
+    dataset before swapping the reference, so requests never see a
+    half-loaded one. Reloads only read files in the configured file's folder.
+    """
+
+    def __init__(self, data_file: str, workers: int = None):
+        self.workers = workers
+        self.metrics = Metrics()
+        self.reload_lock = threading.Lock()
+        self.data_dir = os.path.dirname(os.path.realpath(data_file))
+        self.dataset = Dataset(data_file, workers)
+
+    def query(self, config, chart_formats=None) -> tuple:
+        return run_query(self.dataset, config, chart_formats)
+
+    def allowed_file(self, data_file: str) -> str:
+        """data_file, if it resolves (symlinks and .. included) to a path under the configured folder."""
+        path = os.path.realpath(os.path.join(self.data_dir, data_file))
+        if os.path.commonpath([path, self.data_dir]) != self.data_dir:
+            raise PermissionError(f"data_file must be under the served data folder: {data_file}")
+        return path
+
+    def reload(self, data_file: str = None) -> dict:
+        """Loads data_file (default: the current one) and swaps it in."""
+        with self.reload_lock:
+            previous = self.dataset
+            dataset = Dataset(self.allowed_file(data_file) if data_file else previous.data_file, self.workers)
+            self.dataset = dataset
+            if dataset.version != previous.version:
+                # Results of the replaced version can no longer be asked for
+                # (set_version only covers a reload of the same file)
+                RESULTS.invalidate(previous.version)
+        return {"previous": previous.version, "current": dataset.describe(), "changed": dataset.version != previous.version}
+
+    def status(self) -> dict:
+        return {"dataset": self.dataset.describe(), "result_cache": cache_stats()}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    POST /query    config JSON -> aggregates (?charts=png,svg adds chart files)
+    POST /reload   {"data_file": optional path under the served file's folder} -> swaps in a new dataset version
+    GET  /metrics  latency and throughput per endpoint
+    GET  /status   dataset version and result cache statistics
+    """
+
+    service = None  # set by serve()
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        routes = {
+            "/metrics": lambda: (200, self.service.metrics.snapshot()),
+            "/status": lambda: (200, self.service.status())
+        }
+        self.dispatch(routes)
+
+    def do_POST(self):
+        routes = {
+            "/query": lambda: self.service.query(self.read_json(), self.chart_formats()),
+            "/reload": lambda: (200, self.service.reload((self.read_json() or {}).get("data_file")))
+        }
+        self.dispatch(routes)
+
+    def dispatch(self, routes: dict):
+        path = urlparse(self.path).path
+        started = time.perf_counter()
+        self.service.metrics.begin()
+        try:
+            status, response = routes[path]() if path in routes else (404, {"errors": [f"Unknown endpoint {path}"]})
+        except PermissionError as error:
+            status, response = 403, {"errors": [str(error)]}
+        except (ValueError, OSError) as error:
+            status, response = 400, {"errors": [str(error)]}
+        except Exception as error:
+            status, response = 500, {"errors": [f"{type(error).__name__}: {error}"]}
+        self.send_json(status, response)
+        self.service.metrics.end(path if path in routes else "other", time.perf_counter() - started, status >= 400)
+
+    def read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot carry another request
+            self.close_connection = True
+            raise ValueError(f"Content-Length must be a byte count from 0 to {MAX_BODY_BYTES}")
+        body = self.rfile.read(length)
+        try:
+            return json.loads(body) if body.strip() else None
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON body: {error}")
+
+    def chart_formats(self):
+        charts = parse_qs(urlparse(self.path).query).get("charts")
+        return charts[0].split(",") if charts else None
+
+    def send_json(self, status: int, response: dict):
+        body = json.dumps(response, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # /metrics replaces the per-request access log
+
+
+def make_server(data_file: str, host: str = "127.0.0.1", port: int = 8000, workers: int = None) -> ThreadingHTTPServer:
+    """Loads data_file once and returns a threaded server answering queries against it."""
+    handler = type("BoundQueryHandler", (QueryHandler,), {"service": QueryService(data_file, workers)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(data_file: str, host: str = "127.0.0.1", port: int = 8000, workers: int = None):
+    server = make_server(data_file, host, port, workers)
+    dataset = server.RequestHandlerClass.service.dataset
+    print(f"Serving {dataset.data_file} (version {dataset.version[:12]}, {len(dataset.cleaned_df):,} rows) "
+          f"on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
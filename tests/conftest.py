@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate import ERROR_TYPES, SOURCE_FILE, fit_profile, generate_csv  # noqa: E402
+
+# Every kind of dirty row, enough of each to show up in a few hundred rows
+ERROR_RATES = dict.fromkeys(ERROR_TYPES, 0.02)
+
+
+@pytest.fixture(scope="session")
+def profile():
+    return fit_profile(os.path.join(ROOT, SOURCE_FILE))
+
+
+@pytest.fixture(scope="session")
+def real_csv():
+    return os.path.join(ROOT, SOURCE_FILE)
+
+
+@pytest.fixture(scope="session")
+def synthetic_csv(tmp_path_factory, profile):
+    path = str(tmp_path_factory.mktemp("data") / "synthetic.csv")
+    generate_csv(path, 400, years=30, indicators=1, rates=ERROR_RATES, profile=profile)
+    return path
+
+
+@pytest.fixture(scope="session")
+def multi_indicator_csv(tmp_path_factory, profile):
+    path = str(tmp_path_factory.mktemp("data") / "indicators.csv")
+    generate_csv(path, 200, years=30, indicators=3, rates=ERROR_RATES, profile=profile)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def fresh_results():
+    # Memoized results must not leak between tests
+    from memo import RESULTS
+    RESULTS.invalidate()
+    yield
+    RESULTS.invalidate()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate import STATISTICS
+from cache import load_clean_cached
+from process import aggregate_statistics, aggregate_table, process, table_frame
+from transform import LongView, transform_to_long
+
+
+@pytest.fixture
+def cleaned(synthetic_csv, tmp_path):
+    return load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))[0]
+
+
+def test_long_view_melts_like_transform_to_long(cleaned):
+    pd.testing.assert_frame_equal(LongView(cleaned).to_long(), transform_to_long(cleaned))
+
+
+def test_index_probes_match_scans(cleaned):
+    long = transform_to_long(cleaned)
+    countries = list(pd.unique(cleaned["Country Name"].astype(str)))[:5]
+    regions = list(pd.unique(cleaned["Continent"].astype(str)))[:2]
+    years = [int(col) for col in cleaned.columns if col.isdigit()][:3]
+
+    view = LongView(cleaned).select(countries=countries, regions=regions, years=years).to_long()
+    scan = long[long["Country Name"].isin(countries) & long["Continent"].isin(regions) & long["Year"].isin(years)]
+    pd.testing.assert_frame_equal(view.reset_index(drop=True), scan.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("operation", ["sum", "average"])
+def test_table_cells_equal_per_year_process(cleaned, operation):
+    long = transform_to_long(cleaned)
+    years = [int(col) for col in cleaned.columns if col.isdigit()][::7]
+    table = aggregate_table(LongView(cleaned), years, [operation])
+
+    for year in years:
+        expected = process(long[long["Year"] == year], {"operation": operation}, "Continent")
+        result = table_frame(table, operation, year)
+        np.testing.assert_allclose(result["GDP"].to_numpy(), expected["GDP"].to_numpy())
+        assert result["Continent"].astype(str).tolist() == expected["Continent"].astype(str).tolist()
+
+
+def test_statistics_match_pandas(cleaned):
+    long = transform_to_long(cleaned)
+    result = aggregate_statistics(LongView(cleaned), "Continent", STATISTICS)
+    expected = long.groupby("Continent", observed=True)["GDP"].agg(STATISTICS)
+    for statistic in STATISTICS:
+        np.testing.assert_allclose(result.table[statistic].to_numpy(), expected[statistic].to_numpy())
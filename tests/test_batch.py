@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch import run_batch
+from cache import load_clean_cached
+from filter_by_country import filter_by_country
+from process import aggregate_table, country_frames, table_frame
+from transform import LongView
+
+
+def test_each_config_matches_a_single_run(synthetic_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned, _ = load_clean_cached(synthetic_csv)
+    years = [int(col) for col in cleaned.columns if col.isdigit()]
+    countries = list(pd.unique(cleaned["Country Name"].astype(str)))
+    configs = {
+        "first": {"operation": "sum", "output": "dashboard", "year": years[:2], "country": countries[:2], "region": ["Asia"]},
+        "second": {"operation": "average", "output": "dashboard", "year": years[-1:], "country": countries[2:5], "region": ["Europe"]},
+        "invalid": {"operation": "max", "output": "dashboard", "year": years[:1], "country": countries[:1], "region": ["Asia"]},
+    }
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    for name, config in configs.items():
+        (config_dir / f"{name}.json").write_text(json.dumps(config))
+
+    (config_dir / "malformed.json").write_text('{"operation": "sum",')
+
+    summary = run_batch(synthetic_csv, str(config_dir), str(tmp_path / "out"), charts=False)
+    assert summary["configs"] == 4 and summary["failed"] == 2
+    assert os.path.exists(tmp_path / "out" / "invalid" / "errors.txt")
+    assert (tmp_path / "out" / "malformed" / "errors.txt").read_text().startswith("Invalid JSON")
+
+    df_long = LongView(cleaned)
+    for name in ["first", "second"]:
+        config = configs[name]
+        table = aggregate_table(df_long, config["year"], [config["operation"]])
+        regions = pd.read_csv(tmp_path / "out" / name / "regions.csv")
+        for year in config["year"]:
+            expected = table_frame(table, config["operation"], year)
+            written = regions[regions["Year"] == year]
+            assert written["Continent"].tolist() == expected["Continent"].astype(str).tolist()
+            np.testing.assert_allclose(written["GDP"].to_numpy(), expected["GDP"].to_numpy(), rtol=1e-12)
+
+        countries_out = pd.read_csv(tmp_path / "out" / name / "countries.csv")
+        expected = country_frames(filter_by_country(df_long, config), config["country"], config["operation"])
+        for country, frame in expected.items():
+            written = countries_out[countries_out["Country Name"] == country]
+            np.testing.assert_allclose(written["GDP"].to_numpy(), frame["GDP"].to_numpy(), rtol=1e-12)
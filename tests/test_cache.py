@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pandas as pd
+
+from cache import cache_paths, load_clean_cached, read_cache_meta, is_fresh
+from cleaner import clean_data
+from load_data import load_data
+
+
+def assert_same_clean(left, right):
+    pd.testing.assert_frame_equal(left[0], right[0])
+    assert {k: list(v) for k, v in left[1].items()} == {k: list(v) for k, v in right[1].items()}
+
+
+def test_cold_and_warm_match_clean_data(synthetic_csv, tmp_path, capsys):
+    expected = clean_data(load_data(synthetic_csv))
+    expected_output = capsys.readouterr().out
+
+    cold = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path))
+    cold_output = capsys.readouterr().out
+    warm = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path))
+    warm_output = capsys.readouterr().out
+
+    assert_same_clean(cold, expected)
+    assert_same_clean(warm, expected)
+    assert "GDP CORRECTION REPORT" in expected_output
+    assert cold_output == warm_output == expected_output
+
+
+def test_same_named_sources_keep_separate_entries(synthetic_csv, real_csv, tmp_path):
+    first, second = tmp_path / "a" / "data.csv", tmp_path / "b" / "data.csv"
+    os.makedirs(first.parent)
+    os.makedirs(second.parent)
+    shutil.copy(synthetic_csv, first)
+    shutil.copy(real_csv, second)
+    cache_dir = str(tmp_path / "cache")
+
+    assert cache_paths(str(first), cache_dir) != cache_paths(str(second), cache_dir)
+    first_df, _ = load_clean_cached(str(first), cache_dir=cache_dir)
+    second_df, _ = load_clean_cached(str(second), cache_dir=cache_dir)
+
+    assert is_fresh(str(first), read_cache_meta(str(first), cache_dir))
+    assert is_fresh(str(second), read_cache_meta(str(second), cache_dir))
+    assert len(first_df) != len(second_df)
+
+
+def test_touched_source_refreshes_meta_in_place(synthetic_csv, tmp_path):
+    source = tmp_path / "data.csv"
+    shutil.copy(synthetic_csv, source)
+    cache_dir = str(tmp_path / "cache")
+    load_clean_cached(str(source), cache_dir=cache_dir)
+
+    os.utime(source, ns=(0, 10**18))
+    load_clean_cached(str(source), cache_dir=cache_dir)
+
+    assert read_cache_meta(str(source), cache_dir)["key"]["mtime_ns"] == 10**18
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
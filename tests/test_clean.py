@@ -0,0 +1,52 @@
+import contextlib
+import io
+import subprocess
+
+import pandas as pd
+import pytest
+
+from cleaner import TEXT_COLS, clean_data
+from load_data import load_data
+from parallel import clean_data_parallel
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def same_log(first: dict, second: dict) -> bool:
+    return {k: list(v) for k, v in first.items()} == {k: list(v) for k, v in second.items()}
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype({col: "string" for col in TEXT_COLS})
+
+
+def test_single_pass_clean_matches_the_original_cleaner(synthetic_csv):
+    from benchmarks.bench_clean import baseline_clean_data, first_commit
+
+    try:
+        baseline = baseline_clean_data(first_commit())
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("needs the git history")
+
+    df = load_data(synthetic_csv)
+    legacy_df, legacy_log = quiet(baseline, df.copy())
+    new_df, new_log = quiet(clean_data, df)
+    pd.testing.assert_frame_equal(as_text(legacy_df), as_text(new_df), check_exact=True)
+    assert same_log(legacy_log, new_log)
+
+
+def test_parallel_clean_matches_serial(synthetic_csv):
+    df = load_data(synthetic_csv)
+    serial_df, serial_log = quiet(clean_data, df)
+    parallel_df, parallel_log = quiet(clean_data_parallel, df, workers=2)
+    pd.testing.assert_frame_equal(serial_df, parallel_df)
+    assert same_log(serial_log, parallel_log)
+
+
+def test_text_columns_are_categorical(synthetic_csv):
+    cleaned, _ = quiet(clean_data, load_data(synthetic_csv))
+    assert all(isinstance(cleaned[col].dtype, pd.CategoricalDtype) for col in TEXT_COLS)
+    assert all(cleaned[col].notna().all() for col in ["Country Name", "Continent"])
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from row_ranges import RowRanges
+from visualize_errors import print_errors
+
+
+CSV_ERRORS = {"empty_country": RowRanges.from_rows([3, 4, 5, 9]), "duplicates": RowRanges()}
+
+
+@pytest.mark.parametrize("json_errors", [[], ["Unknown operation 'max'"]])
+def test_report_written_with_or_without_json_errors(tmp_path, capsys, json_errors):
+    path = str(tmp_path / "errors.txt")
+    print_errors(CSV_ERRORS, json_errors, path)
+
+    with open(path) as file:
+        report = file.read()
+    assert "[empty_country] 4 rows" in report
+    assert ("JSON ERRORS" in capsys.readouterr().out) == bool(json_errors)
+
+
+def test_no_report_without_csv_errors(tmp_path, capsys):
+    path = str(tmp_path / "errors.txt")
+    print_errors({"duplicates": RowRanges()}, [], path)
+    assert not os.path.exists(path)
@@ -0,0 +1,31 @@
+import contextlib
+import filecmp
+import io
+
+import pandas as pd
+
+from benchmarks.generate import ERROR_TYPES, generate_csv
+from cleaner import clean_data
+
+
+def test_generated_data_is_deterministic(tmp_path, profile):
+    first, second = str(tmp_path / "first.csv"), str(tmp_path / "second.csv")
+    for path in (first, second):
+        generate_csv(path, 300, years=20, indicators=2, rates={"empty_gdp": 0.05}, profile=profile)
+    assert filecmp.cmp(first, second, shallow=False)
+    assert pd.read_csv(first)["Indicator Code"].nunique() == 2
+
+
+def test_each_injected_error_type_is_flagged(tmp_path, profile):
+    clean, dirty = str(tmp_path / "clean.csv"), str(tmp_path / "dirty.csv")
+    generate_csv(clean, 500, years=20, profile=profile)
+    rows = generate_csv(dirty, 500, years=20, rates=dict.fromkeys(ERROR_TYPES, 0.02), profile=profile)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, clean_log = clean_data(pd.read_csv(clean))
+        _, dirty_log = clean_data(pd.read_csv(dirty))
+    assert rows == len(pd.read_csv(dirty))
+    # Generated data has rows without GDP of its own; injected errors come on top
+    for error_type in ERROR_TYPES:
+        if error_type != "duplicate":
+            assert len(dirty_log[error_type]) > len(clean_log[error_type]), error_type
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+from cleaner import clean_data, TEXT_COLS
+from incremental import clean_with_state, clean_incremental, load_state, save_state, clean_full
+from load_data import load_data
+
+
+def edited(df: pd.DataFrame) -> pd.DataFrame:
+    """A later version of df: renamed and emptied rows, changed GDP and an appended year."""
+    df = df.copy()
+    year_cols = [col for col in df.columns if col not in TEXT_COLS]
+    df[year_cols[-1]] = df[year_cols[-1]].astype(object)
+    df.loc[3, "Country Name"] = "Renamed Land"
+    df.loc[5, "Continent"] = "Atlantis"
+    df.loc[7, year_cols] = 0.0
+    df.loc[9, year_cols[-1]] = "unknown"
+    df[str(int(year_cols[-1]) + 1)] = np.linspace(1.0, 2.0, len(df))
+    return df
+
+
+def assert_same_clean(result, expected):
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    assert {k: list(v) for k, v in result[1].items()} == {k: list(v) for k, v in expected[1].items()}
+
+
+def test_state_round_trips(synthetic_csv, tmp_path):
+    _, _, state = clean_full(load_data(synthetic_csv))
+    path = str(tmp_path / "state.npz")
+    save_state(path, state)
+    loaded = load_state(path)
+    for col, (codes, categories) in state["text"].items():
+        np.testing.assert_array_equal(loaded["text"][col][0], codes)
+        np.testing.assert_array_equal(loaded["text"][col][1], categories)
+    assert set(loaded["masks"]) == set(state["masks"])
+
+
+def test_state_of_another_layout_is_ignored(synthetic_csv, tmp_path):
+    _, _, state = clean_full(load_data(synthetic_csv))
+    path = str(tmp_path / "state.npz")
+    save_state(path, state)
+    with np.load(path) as arrays:
+        old_layout = {name: arrays[name] for name in arrays.files if name != "format"}
+    np.savez(path, **old_layout)
+
+    assert load_state(path) is None
+
+
+def test_text_columns_are_categorical(synthetic_csv, tmp_path):
+    cleaned, _ = clean_with_state(load_data(synthetic_csv), str(tmp_path / "state.npz"))
+    assert all(isinstance(cleaned[col].dtype, pd.CategoricalDtype) for col in TEXT_COLS)
+    expected, _ = clean_data(load_data(synthetic_csv))
+    pd.testing.assert_frame_equal(cleaned, expected)
+
+
+def test_incremental_matches_full_clean(synthetic_csv):
+    before = load_data(synthetic_csv)
+    _, _, state = clean_full(before)
+    after = edited(before)
+
+    cleaned, error_log, _, rechecked = clean_incremental(after, state)
+    assert_same_clean((cleaned, error_log), clean_data(after))
+    assert rechecked == 2
+
+
+@pytest.mark.parametrize("collide", [False, True])
+def test_hash_collisions_never_reuse_stale_text(synthetic_csv, monkeypatch, collide):
+    before = load_data(synthetic_csv)
+    _, _, state = clean_full(before)
+    if collide:
+        # Every row hashing alike: a match must still be confirmed on the values
+        constant = lambda codes: np.zeros(len(next(iter(codes.values()))), dtype=np.uint64)
+        monkeypatch.setattr(incremental, "code_keys", constant)
+    after = edited(before)
+
+    cleaned, error_log, _, _ = clean_incremental(after, state)
+    assert_same_clean((cleaned, error_log), clean_data(after))
+
+
+def test_rechecked_rows_over_workers_match_full_clean(synthetic_csv, monkeypatch):
+    before = load_data(synthetic_csv)
+    _, _, state = clean_full(before)
+    after = edited(before)
+    after["Country Name"] = after["Country Name"] + " (new)"
+    monkeypatch.setattr("parallel.MIN_PARTITION_ROWS", 10)
+
+    cleaned, error_log, _, rechecked = clean_incremental(after, state, workers=2)
+    assert_same_clean((cleaned, error_log), clean_data(after))
+    # Every unique row was renamed, so every one was rechecked
+    assert rechecked == (~after.duplicated()).sum()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import load_clean_cached
+from cube import DataCube
+from filter_by_country import filter_by_country
+from filter_by_indicator import filter_by_indicator
+from matrix_store import open_matrix_store
+from pipeline import StageCache, run_pipeline
+from planner import compile_plan, run_plan
+from process import aggregate_table, country_frames, table_frame
+from transform import LongView
+from validate_json import validate_json
+
+
+@pytest.fixture
+def cleaned(multi_indicator_csv, tmp_path):
+    return load_clean_cached(multi_indicator_csv, cache_dir=str(tmp_path / "cache"))[0]
+
+
+def config_for(cleaned_df, indicator=None) -> dict:
+    years = [int(col) for col in cleaned_df.columns if col.isdigit() and int(col) <= 2024]
+    config = {
+        "operation": "sum", "output": "dashboard",
+        "country": list(pd.unique(cleaned_df["Country Name"].astype(str)))[:3],
+        "region": list(pd.unique(cleaned_df["Continent"].astype(str)))[:2],
+        "year": [years[0], years[-1]],
+    }
+    if indicator is not None:
+        config["indicator"] = indicator
+    return config
+
+
+def dashboard(df_long, validated) -> tuple:
+    """Region and country results the default path draws."""
+    df_long = filter_by_indicator(df_long, validated)
+    table = aggregate_table(df_long, validated["year"], [validated["operation"]])
+    regions = {year: table_frame(table, validated["operation"], year) for year in validated["year"]}
+    countries = country_frames(filter_by_country(df_long, validated), validated["country"], validated["operation"])
+    return regions, countries
+
+
+def assert_same(first: tuple, second: tuple):
+    for left, right in zip(first, second):
+        assert left.keys() == right.keys()
+        for key in left:
+            pd.testing.assert_frame_equal(
+                left[key].reset_index(drop=True), right[key].reset_index(drop=True), check_dtype=False, check_categorical=False
+            )
+
+
+def test_multi_indicator_files_need_one_indicator(cleaned):
+    codes = sorted(cleaned["Indicator Code"].astype(str).unique())
+
+    _, errors = validate_json(config_for(cleaned), cleaned)
+    assert any("choose one with 'indicator'" in error for error in errors)
+    _, errors = validate_json(config_for(cleaned, codes[:2]), cleaned)
+    assert any("single indicator" in error for error in errors)
+
+    # --cube draws one dashboard per indicator, so both are fine there
+    assert validate_json(config_for(cleaned), cleaned, per_indicator=True)[1] == []
+    assert validate_json(config_for(cleaned, codes[:2]), cleaned, per_indicator=True)[1] == []
+
+
+def test_every_path_matches_the_cube_slice(cleaned, multi_indicator_csv, tmp_path):
+    data_cube = DataCube.from_frame(cleaned)
+    matrix = open_matrix_store(multi_indicator_csv, cleaned, root=str(tmp_path / "matrix"))
+    codes = list(data_cube.indicators["Indicator Code"])
+    names = list(data_cube.indicators["Indicator Name"])
+    assert len(codes) == 3
+
+    for code, name in zip(codes, names):
+        validated, errors = validate_json(config_for(cleaned, [code]), cleaned)
+        assert errors == []
+        # Cube slices: the per-indicator reference
+        cube_slice = data_cube.indicator(code)
+        table = aggregate_table(cube_slice, validated["year"], ["sum"])
+        expected = (
+            {year: table_frame(table, "sum", year) for year in validated["year"]},
+            country_frames(filter_by_country(cube_slice, validated), validated["country"], "sum")
+        )
+
+        assert_same(dashboard(LongView(cleaned), validated), expected)
+        assert_same(dashboard(matrix, validated), expected)
+        # By name as well as by code
+        assert_same(dashboard(LongView(cleaned), validate_json(config_for(cleaned, [name]), cleaned)[0]), expected)
+
+        results, _ = run_plan(compile_plan(validated), cleaned)
+        assert_same((results["regions"], results["countries"]), expected)
+
+
+def test_pipeline_selects_the_indicator(cleaned, multi_indicator_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = StageCache(str(tmp_path / "stages"))
+    for code in DataCube.from_frame(cleaned).indicators["Indicator Code"]:
+        _, validated, errors, regions, countries, _ = run_pipeline(multi_indicator_csv, config_for(cleaned, [code]), cache)
+        assert errors == []
+        assert_same((regions, countries), dashboard(LongView(cleaned), validated))
+
+
+def test_single_indicator_files_need_no_choice(synthetic_csv, tmp_path):
+    cleaned, _ = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))
+    validated, errors = validate_json(config_for(cleaned), cleaned)
+    assert errors == []
+    assert filter_by_indicator(LongView(cleaned), validated).rows is None
@@ -0,0 +1,56 @@
+import os
+import threading
+
+import numpy as np
+
+from cache import file_key, load_clean_cached
+from matrix_store import open_matrix_store, save_matrix_store, store_directory
+from transform import LongView
+
+
+def test_store_matches_long_view(synthetic_csv, tmp_path):
+    cleaned, _ = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))
+    matrix = open_matrix_store(synthetic_csv, cleaned, root=str(tmp_path / "matrix"))
+    years = [int(col) for col in cleaned.columns if col.isdigit()][:5]
+
+    for operation in ["sum", "average"]:
+        expected = LongView(cleaned).select(years=years).to_long()
+        expected = expected.groupby("Continent", observed=True)["GDP"].agg("sum" if operation == "sum" else "mean")
+        result = matrix.select(years=years).aggregate(operation, "Continent")
+        np.testing.assert_allclose(result["GDP"].to_numpy(), expected.to_numpy())
+
+
+def test_sources_keep_separate_stores(synthetic_csv, real_csv, tmp_path):
+    root = str(tmp_path / "matrix")
+    first, _ = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))
+    second, _ = load_clean_cached(real_csv, cache_dir=str(tmp_path / "cache"))
+
+    open_matrix_store(synthetic_csv, first, root=root)
+    open_matrix_store(real_csv, second, root=root)
+
+    # Both stay fresh: reopening needs no frame to rebuild from
+    assert open_matrix_store(synthetic_csv, root=root).gdp.shape[0] == len(first)
+    assert open_matrix_store(real_csv, root=root).gdp.shape[0] == len(second)
+    assert store_directory(synthetic_csv, root) != store_directory(real_csv, root)
+
+
+def test_concurrent_rebuilds_leave_a_complete_store(real_csv, tmp_path):
+    cleaned, _ = load_clean_cached(real_csv, cache_dir=str(tmp_path / "cache"))
+    directory = store_directory(real_csv, str(tmp_path / "matrix"))
+    key = file_key(real_csv)
+    errors = []
+
+    def build():
+        try:
+            save_matrix_store(cleaned, key, directory)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    list(map(lambda thread: thread.start(), threads))
+    list(map(lambda thread: thread.join(), threads))
+
+    assert not errors
+    assert sorted(os.listdir(os.path.dirname(directory))) == [os.path.basename(directory)]
+    matrix = open_matrix_store(real_csv, root=os.path.dirname(directory))
+    assert matrix.gdp.shape == (len(cleaned), len([col for col in cleaned.columns if col.isdigit()]))
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from main import result_cache
+from memo import RESULTS, memoized, set_version, version_of
+from process import aggregate_table
+from transform import LongView
+
+
+def frame(gdp: float) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Country Name": ["A", "B"], "Country Code": ["AAA", "BBB"],
+        "Indicator Name": ["GDP"] * 2, "Indicator Code": ["NY"] * 2,
+        "Continent": ["Asia", "Europe"], "2000": [gdp, 2 * gdp]
+    })
+
+
+def test_untagged_data_is_not_memoized():
+    calls = []
+    df = frame(1.0)
+    for _ in range(2):
+        memoized(df, ("query",), lambda: calls.append(1))
+    assert version_of(df) is None
+    assert len(calls) == 2 and len(RESULTS) == 0
+
+
+def test_row_selections_are_versioned_by_content():
+    df = frame(1.0)
+    set_version(df, "v1")
+    first, second = LongView(df, rows=np.array([0])), LongView(df, rows=np.array([1]))
+    assert version_of(first) != version_of(second)
+    assert version_of(first) == version_of(LongView(df, rows=np.array([0])))
+
+
+def test_tagged_data_is_memoized_per_version():
+    df = frame(1.0)
+    set_version(df, "v1")
+    hits = RESULTS.hits
+    first = aggregate_table(LongView(df), [2000], ["sum"])
+    second = aggregate_table(LongView(df), [2000], ["sum"])
+    pd.testing.assert_frame_equal(first, second)
+    assert RESULTS.hits == hits + 1
+
+
+def test_reloading_a_source_drops_its_results():
+    old, new = frame(1.0), frame(10.0)
+    set_version(old, "old-version", source="data.csv")
+    assert aggregate_table(LongView(old), [2000], ["sum"])[("sum", 2000)].sum() == 3.0
+    assert len(RESULTS) == 1
+
+    set_version(new, "new-version", source="data.csv")
+    assert len(RESULTS) == 0
+    assert aggregate_table(LongView(new), [2000], ["sum"])[("sum", 2000)].sum() == 30.0
+
+
+def test_result_cache_bounds_and_reports_any_mode(capsys):
+    before = RESULTS.max_entries, RESULTS.max_bytes
+    try:
+        with result_cache(memo_entries=3, memo_stats=True):
+            assert RESULTS.max_entries == 3
+        assert "RESULT CACHE" in capsys.readouterr().out
+    finally:
+        RESULTS.resize(*before)
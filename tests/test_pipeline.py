@@ -0,0 +1,61 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import StageCache, run_pipeline
+
+
+@pytest.fixture
+def config(synthetic_csv) -> dict:
+    df = pd.read_csv(synthetic_csv)
+    years = [int(col) for col in df.columns if col.isdigit() and int(col) <= 2024]
+    return {
+        "operation": "sum", "output": "dashboard", "year": [years[0], years[-1]],
+        "country": list(df["Country Name"].dropna().unique()[:3]),
+        "region": list(df["Continent"].dropna().unique()[:1]),
+    }
+
+
+def test_warm_run_matches_cold_run(synthetic_csv, config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = StageCache(str(tmp_path / "stages"))
+    cold = run_pipeline(synthetic_csv, config, cache)
+    warm = run_pipeline(synthetic_csv, config, cache)
+
+    for cold_results, warm_results in zip(cold[3:5], warm[3:5]):
+        assert cold_results.keys() == warm_results.keys()
+        for key in cold_results:
+            pd.testing.assert_frame_equal(cold_results[key], warm_results[key], check_dtype=False)
+
+    cached = {stat["stage"]: stat["cached"] for stat in warm[5]}
+    assert cached["regions"] and cached["countries"] and not cached["filter"]
+    # Only the process outputs are stored
+    assert len([name for name in os.listdir(cache.directory) if name.endswith(".npz")]) == 2
+
+
+def test_concurrent_saves_of_one_key(tmp_path):
+    cache = StageCache(str(tmp_path / "stages"))
+    arrays = {"values": np.arange(100_000)}
+    threads = [threading.Thread(target=cache.save, args=("key", arrays)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    np.testing.assert_array_equal(cache.load("key")["values"], arrays["values"])
+    assert os.listdir(cache.directory) == ["key.npz"]
+
+
+def test_evict_drops_stale_temp_files(tmp_path):
+    cache = StageCache(str(tmp_path / "stages"), max_bytes=0)
+    os.makedirs(cache.directory)
+    stale, fresh = (os.path.join(cache.directory, name) for name in ("stale.tmp", "fresh.tmp"))
+    for path in (stale, fresh):
+        open(path, "wb").close()
+    os.utime(stale, (0, 0))
+
+    cache.save("key", {"values": np.arange(10)})
+    assert sorted(os.listdir(cache.directory)) == ["fresh.tmp"]
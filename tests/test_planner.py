@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from cache import load_clean_cached
+from filter_by_country import filter_by_country
+from planner import compile_plan, explain, run_plan
+from process import aggregate_table, country_frames, table_frame
+from transform import LongView
+from validate_json import validate_json
+
+
+@pytest.fixture
+def cleaned(synthetic_csv, tmp_path):
+    return load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))[0]
+
+
+def config_for(cleaned_df, operation: str) -> dict:
+    years = [int(col) for col in cleaned_df.columns if col.isdigit() and int(col) <= 2024]
+    config = {
+        "operation": operation, "output": "dashboard",
+        "country": list(pd.unique(cleaned_df["Country Name"].astype(str)))[:4],
+        "region": list(pd.unique(cleaned_df["Continent"].astype(str)))[:2],
+        "year": [years[0], years[len(years) // 2], years[-1]],
+    }
+    validated, errors = validate_json(config, cleaned_df)
+    assert errors == []
+    return validated
+
+
+@pytest.mark.parametrize("operation", ["sum", "average"])
+def test_plan_matches_the_default_path(cleaned, operation):
+    validated = config_for(cleaned, operation)
+    results, _ = run_plan(compile_plan(validated), cleaned)
+
+    df_long = LongView(cleaned)
+    table = aggregate_table(df_long, validated["year"], [operation])
+    for year in validated["year"]:
+        expected = table_frame(table, operation, year)
+        pd.testing.assert_frame_equal(results["regions"][year], expected, check_dtype=False)
+
+    expected = country_frames(filter_by_country(df_long, validated), validated["country"], operation)
+    for country, frame in expected.items():
+        pd.testing.assert_frame_equal(
+            results["countries"][country].reset_index(drop=True), frame.reset_index(drop=True), check_dtype=False
+        )
+
+
+def test_stats_count_the_matched_cells(cleaned):
+    validated = config_for(cleaned, "sum")
+    plan = compile_plan(validated)
+    _, stats = run_plan(plan, cleaned)
+    steps = {step["step"]: step for step in stats}
+
+    n_years = sum(col.isdigit() for col in cleaned.columns)
+    country_rows = int(cleaned["Country Name"].isin(validated["country"]).sum())
+    years = len(validated["year"])
+    matched = len(cleaned) * years + country_rows * (n_years - years)
+
+    assert steps["scan"]["rows_in"] == len(cleaned) * n_years
+    assert steps["scan"]["rows_out"] == matched
+    assert steps["regions"]["rows_in"] == len(cleaned) * years
+    assert steps["regions"]["rows_out"] == years * cleaned["Continent"].nunique()
+    assert steps["countries"]["rows_in"] == country_rows * n_years
+    assert "GROUP BY Year, Continent" in explain(plan, stats)
+
+
+def test_plan_groups_by_its_own_keys(cleaned):
+    # The executor reads group_by from the plan instead of assuming it
+    validated = config_for(cleaned, "sum")
+    plan = compile_plan(validated)
+    plan["outputs"]["regions"]["group_by"] = ["Year", "Country Code"]
+    results, _ = run_plan(plan, cleaned)
+
+    year = validated["year"][0]
+    expected = cleaned.groupby("Country Code", observed=True)[str(year)].sum()
+    assert list(results["regions"][year].columns) == ["Country Code", "GDP"]
+    assert results["regions"][year]["GDP"].tolist() == pytest.approx(expected.tolist())
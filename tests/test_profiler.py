@@ -0,0 +1,31 @@
+import json
+
+import profiler
+from cache import load_clean_cached
+from transform import transform_to_long
+
+
+def test_profiled_calls_are_recorded(synthetic_csv, tmp_path):
+    cleaned, _ = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))
+    profiler.enable()
+    try:
+        long = transform_to_long(cleaned)
+    finally:
+        events = profiler.disable()
+
+    (event,) = [event for event in events if event["name"] == "transform_to_long"]
+    assert event["rows_in"] == len(cleaned) and event["rows_out"] == len(long)
+    assert event["wall"] >= 0 and event["peak_bytes"] > 0
+
+    path = str(tmp_path / "trace.json")
+    profiler.write_trace(events, path)
+    with open(path) as file:
+        trace = json.load(file)
+    assert [span["name"] for span in trace["traceEvents"]] == [event["name"] for event in events]
+
+
+def test_nothing_recorded_when_off(synthetic_csv, tmp_path):
+    cleaned, _ = load_clean_cached(synthetic_csv, cache_dir=str(tmp_path / "cache"))
+    transform_to_long(cleaned)
+    assert not profiler.is_enabled()
+    assert profiler.disable() == []
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from cleaner import clean_data, TEXT_COLS
+from load_data import load_data
+from pushdown import clean_and_validate_pushdown, pushdown_columns
+
+
+def config_for(cleaned_df, operation="sum"):
+    years = [int(col) for col in cleaned_df.columns if col not in TEXT_COLS]
+    return {
+        "region": list(cleaned_df["Continent"].astype(str).unique()[:2]),
+        "year": [years[0], years[-1]],
+        "country": list(cleaned_df["Country Name"].astype(str).unique()[:3]),
+        "operation": operation,
+        "output": "dashboard"
+    }
+
+
+def as_text(df):
+    return df.astype({col: str for col in TEXT_COLS if col in df.columns})
+
+
+def check_matches_full_load(path, operation, chunksize=None, monkeypatch=None):
+    cleaned, errors = clean_data(load_data(path))
+    config = config_for(cleaned, operation)
+    if chunksize:
+        monkeypatch.setattr("pushdown.CHUNK_ROWS", chunksize)
+    region, country, csv_errors, _, json_errors = clean_and_validate_pushdown(path, config)
+
+    assert not json_errors
+    assert {k: list(v) for k, v in csv_errors.items()} == {k: list(v) for k, v in errors.items()}
+    pd.testing.assert_frame_equal(region, cleaned[pushdown_columns(list(cleaned.columns), config)].reset_index(drop=True))
+    expected_country = cleaned[cleaned["Country Name"].isin(config["country"])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(as_text(country), as_text(expected_country))
+
+
+@pytest.mark.parametrize("operation", ["sum", "average"])
+def test_real_csv_matches_full_load(real_csv, operation):
+    check_matches_full_load(real_csv, operation)
+
+
+def test_synthetic_csv_matches_full_load(synthetic_csv):
+    check_matches_full_load(synthetic_csv, "sum")
+
+
+def test_small_chunks_match_full_load(synthetic_csv, monkeypatch):
+    check_matches_full_load(synthetic_csv, "average", chunksize=50, monkeypatch=monkeypatch)
+
+
+@pytest.mark.parametrize("text_column", [False, True])
+def test_duplicates_judged_on_parsed_values(real_csv, tmp_path, text_column):
+    # "1.0" and "1" are the same number, but different text once the column holds text
+    df = pd.read_csv(real_csv, dtype=str).head(5)
+    first, second = df.iloc[0].copy(), df.iloc[0].copy()
+    first["1990"], second["1990"] = "1.0", "1"
+    df = pd.concat([df, first.to_frame().T, second.to_frame().T], ignore_index=True)
+    if text_column:
+        df.loc[1, "1990"] = "n.a"
+    path = tmp_path / "dupes.csv"
+    df.to_csv(path, index=False)
+
+    check_matches_full_load(str(path), "sum")
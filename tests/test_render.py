@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cache import load_clean_cached
+from main import main_cube
+from render import set_headless, set_interactive
+from validate_json import validate_json
+
+
+def test_cube_charts_keep_one_folder_per_indicator(multi_indicator_csv, tmp_path):
+    cleaned, _ = load_clean_cached(multi_indicator_csv, cache_dir=str(tmp_path / "cache"))
+    year = min(int(col) for col in cleaned.columns if col.isdigit())
+    config = {
+        "operation": "sum", "output": "dashboard", "year": [year],
+        "country": list(pd.unique(cleaned["Country Name"].astype(str)))[:2],
+        "region": list(pd.unique(cleaned["Continent"].astype(str)))[:1],
+    }
+    validated, errors = validate_json(config, cleaned, per_indicator=True)
+    assert errors == []
+
+    chart_dir = str(tmp_path / "charts")
+    set_headless(chart_dir)
+    try:
+        main_cube(cleaned, validated)
+    finally:
+        set_interactive()
+
+    codes = sorted(cleaned["Indicator Code"].astype(str).unique())
+    assert sorted(os.listdir(chart_dir)) == codes
+    charts = [sorted(os.listdir(os.path.join(chart_dir, code))) for code in codes]
+    assert all(names == charts[0] for names in charts)
+    assert f"region-{year}-bar.png" in charts[0]
+
+
+def test_render_pool_closed_when_the_run_fails(tmp_path, monkeypatch):
+    import main
+    import render
+
+    def failing_run(*args):
+        raise RuntimeError("config went away")
+
+    monkeypatch.setattr(main, "run", failing_run)
+    try:
+        with pytest.raises(RuntimeError):
+            main.main(headless=str(tmp_path / "charts"), render_workers=2)
+        assert render._pool is None
+    finally:
+        set_interactive()
+
+
+def test_plotting_stack_loads_only_with_charts():
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, main; print(sorted({'matplotlib', 'seaborn'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,126 @@
+import http.client
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+import pandas as pd
+import pytest
+
+from memo import RESULTS
+from server import make_server
+
+
+@pytest.fixture
+def served(synthetic_csv, real_csv, tmp_path, monkeypatch):
+    # Clean caches land in tmp_path; the served folder holds two data files
+    monkeypatch.chdir(tmp_path)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shutil.copy(synthetic_csv, data_dir / "first.csv")
+    shutil.copy(real_csv, data_dir / "second.csv")
+
+    server = make_server(str(data_dir / "first.csv"), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", data_dir
+    server.shutdown()
+    server.server_close()
+
+
+def post(url: str, body) -> tuple:
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def config_for(path) -> dict:
+    df = pd.read_csv(path)
+    years = [int(col) for col in df.columns if col.isdigit() and int(col) <= 2024]
+    return {
+        "operation": "sum", "output": "dashboard", "year": [years[-1]],
+        "country": list(df["Country Name"].dropna().unique()[:2]),
+        "region": list(df["Continent"].dropna().unique()[:1]),
+    }
+
+
+def test_query_and_reload(served, tmp_path):
+    url, data_dir = served
+    status, first = post(url + "/query", config_for(data_dir / "first.csv"))
+    assert status == 200
+    assert len(RESULTS) > 0
+
+    status, reloaded = post(url + "/reload", {"data_file": "second.csv"})
+    assert status == 200 and reloaded["changed"]
+    # Results of the replaced version are dropped
+    assert all(key[0] != first["version"] for key in RESULTS.entries)
+
+    status, second = post(url + "/query", config_for(data_dir / "second.csv"))
+    assert status == 200 and second["version"] == reloaded["current"]["version"]
+
+
+@pytest.mark.parametrize("data_file", ["../outside.csv", "/etc/passwd"])
+def test_reload_refuses_files_outside_the_served_folder(served, tmp_path, data_file):
+    url, _ = served
+    (tmp_path / "outside.csv").write_text("not served")
+    status, response = post(url + "/reload", {"data_file": data_file})
+    assert status == 403
+    assert "served data folder" in response["errors"][0]
+
+
+def test_failed_render_leaves_headless_mode(served, monkeypatch):
+    import render
+    import visualize_countries
+
+    def fail(*args):
+        raise RuntimeError("render failed")
+
+    url, data_dir = served
+    monkeypatch.setattr(visualize_countries, "visualize_countries", fail)
+    status, _ = post(url + "/query?charts=png", config_for(data_dir / "first.csv"))
+    assert status == 500
+    assert not render.is_headless()
+
+
+@pytest.mark.parametrize("length", ["-1", "many"])
+def test_bad_content_length_is_a_client_error(served, length):
+    url, _ = served
+    connection = http.client.HTTPConnection(urlparse(url).netloc, timeout=10)
+    connection.putrequest("POST", "/query")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    assert "Content-Length" in json.load(response)["errors"][0]
+    connection.close()
+
+
+def test_cache_statistics_are_consistent_under_resizes():
+    from memo import LRUCache
+
+    cache = LRUCache(max_entries=64)
+    stop = threading.Event()
+
+    def fill():
+        i = 0
+        while not stop.is_set():
+            cache.put((i % 200,), i)
+            i += 1
+
+    threads = [threading.Thread(target=fill) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        for size in list(range(1, 64)) * 5:
+            cache.resize(max_entries=size)
+            stats = cache.stats()
+            assert stats["entries"] <= stats["max_entries"]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
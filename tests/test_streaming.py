@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cleaner
+from cleaner import clean_data, clean_data_chunked, TEXT_COLS
+from load_data import load_data
+
+
+@pytest.mark.parametrize("chunksize", [7, 37, 10_000])
+def test_chunked_matches_full_clean(synthetic_csv, chunksize):
+    cleaned, errors = clean_data(load_data(synthetic_csv))
+    chunked, chunked_errors = clean_data_chunked(load_data(synthetic_csv, chunksize))
+
+    pd.testing.assert_frame_equal(chunked, cleaned)
+    assert {k: list(v) for k, v in chunked_errors.items()} == {k: list(v) for k, v in errors.items()}
+
+
+def test_hash_collision_within_a_chunk_keeps_both_rows(synthetic_csv, monkeypatch):
+    # Every row hashing alike must not make distinct rows duplicates
+    monkeypatch.setattr(cleaner, "row_hashes", lambda df: np.zeros(len(df), dtype=np.uint64))
+    df = load_data(synthetic_csv).head(50).drop_duplicates()
+
+    chunked, _ = clean_data_chunked([df])
+    expected, _ = clean_data(df)
+    assert len(chunked) == len(expected)
+
+
+def test_no_chunks_gives_an_empty_result():
+    cleaned, errors = clean_data_chunked(iter([]))
+    assert len(cleaned) == 0
+    assert list(cleaned.columns) == TEXT_COLS
+    assert not any(errors.values())
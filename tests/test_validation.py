@@ -0,0 +1,28 @@
+from cache import load_clean_cached, data_version
+from memo import RESULTS, set_version
+from validate_json import validate_json, validate_many
+from vocabulary import vocabulary_of
+
+
+CONFIG = {
+    "region": ["Europe", "North America"], "year": [1960, 2024], "country": ["Pakistan", "India"],
+    "operation": "sum", "output": "dashboard"
+}
+
+
+def test_batch_validation_matches_one_by_one(real_csv, tmp_path):
+    cleaned, _ = load_clean_cached(real_csv, cache_dir=str(tmp_path / "cache"))
+    configs = [CONFIG, dict(CONFIG, operation="max"), dict(CONFIG, country=["Pakistn"]), {"year": 1960}]
+    assert validate_many(configs, cleaned) == [validate_json(config, cleaned) for config in configs]
+    # The vocabulary is built once per data version, outside the results cache
+    set_version(cleaned, data_version(real_csv, cache_dir=str(tmp_path / "cache")))
+    RESULTS.reset_stats()
+    assert vocabulary_of(cleaned) is vocabulary_of(cleaned)
+    assert len(RESULTS) == 0 and RESULTS.stats()["misses"] == 0
+
+
+def test_unknown_names_get_suggestions(real_csv, tmp_path):
+    cleaned, _ = load_clean_cached(real_csv, cache_dir=str(tmp_path / "cache"))
+    _, errors = validate_json(dict(CONFIG, country=["Pakistn"], region=["Eurpe"]), cleaned)
+    assert any("'Pakistn' → Pakistan" in error for error in errors)
+    assert any("'Eurpe' → Europe" in error for error in errors)
@@ -1,8 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import TEXT_COLS
+from matrix_store import as_list
+from lookup import LookupIndex, lookup_either, restrict
+from profiler import profiled
+
+
+@profiled
 def transform_to_long(cleaned_df):
-    df_long = cleaned_df.melt(
-        id_vars=["Country Name", "Country Code", "Indicator Name", "Indicator Code", "Continent"],
-        var_name="Year",
-        value_name="GDP"
-    )
-    df_long["Year"] = df_long["Year"].astype(int)
-    return df_long
+    # Same frame as cleaned_df.melt(id_vars=TEXT_COLS, var_name="Year",
+    # value_name="GDP"), built by indexing instead of concatenating copies
+    year_cols = [col for col in cleaned_df.columns if col not in TEXT_COLS]
+    n_rows, n_years = len(cleaned_df), len(year_cols)
+    tiled = np.tile(np.arange(n_rows), n_years)
+
+    columns = {col: cleaned_df[col].array.take(tiled) for col in TEXT_COLS}
+    columns["Year"] = np.repeat(np.array(year_cols, dtype=int), n_rows)
+    columns["GDP"] = cleaned_df[year_cols].to_numpy(dtype=float).ravel(order="F")
+    return pd.DataFrame(columns)
+
+
+# ---------- LAZY LONG VIEW ----------
+
+class LongView:
+    """
+    Long-format view over the wide cleaned frame that melts nothing up front.
+
+    select() narrows the view to rows and year columns of the wide frame
+    (one year or one country is a select of just that key); only to_long()
+    melts, and only the selected slice. Used in place of
+    transform_to_long's result wherever the long frame went.
+
+    Country and continent selections probe LookupIndexes over the wide
+    rows, built on first use and shared by every view sliced from this one.
+    """
+
+    def __init__(self, wide: pd.DataFrame, rows=None, year_cols=None, indexes=None):
+        self.wide = wide
+        self.rows = rows  # sorted wide row positions, None for all rows
+        self.year_cols = [col for col in wide.columns if col not in TEXT_COLS] if year_cols is None else year_cols
+        self.indexes = {} if indexes is None else indexes
+
+    def __len__(self):
+        return len(self.row_positions()) * len(self.year_cols)
+
+    # ---------- SLICING ----------
+
+    def row_positions(self) -> np.ndarray:
+        return np.arange(len(self.wide)) if self.rows is None else self.rows
+
+    def index(self, col: str) -> LookupIndex:
+        if col not in self.indexes:
+            self.indexes[col] = LookupIndex(self.wide[col])
+        return self.indexes[col]
+
+    def select(self, countries=None, regions=None, years=None, indicators=None):
+        """Slice by country names, continents, years and/or indicator codes or names, without melting."""
+        rows = self.rows
+        if countries is not None:
+            rows = restrict(rows, self.index("Country Name").lookup(as_list(countries)))
+        if regions is not None:
+            rows = restrict(rows, self.index("Continent").lookup(as_list(regions)))
+        if indicators is not None:
+            found = lookup_either(self.index("Indicator Code"), self.index("Indicator Name"), as_list(indicators))
+            rows = restrict(rows, found)
+
+        year_cols = self.year_cols
+        if years is not None:
+            wanted = {str(year) for year in as_list(years)}
+            year_cols = [col for col in year_cols if col in wanted]
+
+        return LongView(self.wide, rows, year_cols, self.indexes)
+
+    # ---------- CONVERSION ----------
+
+    def to_long(self) -> pd.DataFrame:
+        """transform_to_long of just the selected rows and years."""
+        wide = self.wide if self.rows is None else self.wide.iloc[self.rows]
+        return transform_to_long(wide[TEXT_COLS + self.year_cols])
@@ -1,16 +1,36 @@
 import pandas as pd
-
-def validate_json(config: dict, clean_df: pd.DataFrame):
+from aggregate import STATISTICS
+from vocabulary import Vocabulary, vocabulary_of
+from profiler import profiled
+
+
+def with_suggestions(message: str, invalid: list, vocabulary: Vocabulary, kind: str) -> str:
+    """Error message plus "did you mean" names for each invalid entry that has any."""
+    hints = [
+        f"'{name}' → {', '.join(suggestions)}"
+        for name, suggestions in map(lambda name: (name, vocabulary.suggest(kind, name)), invalid)
+        if suggestions
+    ]
+    return f"{message}. Did you mean: {'; '.join(hints)}?" if hints else message
+
+
+@profiled
+def validate_json(config: dict, clean_df: pd.DataFrame = None, vocabulary: Vocabulary = None,
+                  per_indicator: bool = False):
+    # vocabulary: prebuilt Vocabulary, used instead of scanning clean_df
+    # per_indicator: the caller draws one dashboard per indicator (--cube), so
+    # any number of indicators may be chosen; otherwise exactly one is aggregated
     errors = []
 
     required_keys = {"operation", "output", "country", "region", "year"}
+    optional_keys = {"indicator", "statistics"}
 
     # ---------- 1. STRUCTURE CHECK ----------
     if not isinstance(config, dict):
         return None, ["JSON must be a dictionary"]
 
     missing_keys = required_keys - config.keys()
-    extra_keys = config.keys() - required_keys
+    extra_keys = config.keys() - required_keys - optional_keys
 
     errors += list(map(lambda k: f"Missing keys: {list(missing_keys)}", missing_keys))
     errors += list(map(lambda k: f"Extra keys not allowed: {list(extra_keys)}", extra_keys))
@@ -44,9 +64,8 @@ def validate_json(config: dict, clean_df: pd.DataFrame):
         errors.append("Output must be 'dashboard'")
 
     # ---------- 5. DF REFERENCES ----------
-    df_countries = set(clean_df["Country Name"].str.strip())
-    df_regions = set(clean_df["Continent"].str.strip())
-    df_years = {int(col) for col in clean_df.columns if col.isdigit()}
+    vocabulary = vocabulary or vocabulary_of(clean_df)
+    df_countries, df_regions, df_years = vocabulary.countries, vocabulary.regions, vocabulary.years
 
     # ---------- 6. COUNTRY ----------
     countries = config.get("country", [])
@@ -54,7 +73,7 @@ def validate_json(config: dict, clean_df: pd.DataFrame):
 
     invalid_countries = list(filter(lambda c: c not in df_countries, countries))
     if invalid_countries:
-        errors.append(f"Invalid country names: {invalid_countries}")
+        errors.append(with_suggestions(f"Invalid country names: {invalid_countries}", invalid_countries, vocabulary, "countries"))
 
     # ---------- 7. REGION ----------
     regions = config.get("region", [])
@@ -62,7 +81,7 @@ def validate_json(config: dict, clean_df: pd.DataFrame):
 
     invalid_regions = list(filter(lambda r: r not in df_regions, regions))
     if invalid_regions:
-        errors.append(f"Invalid regions: {invalid_regions}")
+        errors.append(with_suggestions(f"Invalid regions: {invalid_regions}", invalid_regions, vocabulary, "regions"))
 
     # ---------- 8. YEAR ----------
     years = config.get("year", [])
@@ -78,7 +97,30 @@ def validate_json(config: dict, clean_df: pd.DataFrame):
     if invalid_years:
         errors.append(f"Invalid years: {invalid_years}")
 
-    # ---------- 9. RETURN ----------
+    # ---------- 9. INDICATOR (optional) ----------
+    indicators = config.get("indicator") or []
+    indicators = [indicators] if isinstance(indicators, str) else indicators
+
+    if indicators:
+        invalid_indicators = list(filter(lambda i: i not in vocabulary.indicators, indicators))
+        if invalid_indicators:
+            errors.append(f"Invalid indicators: {invalid_indicators}")
+
+    # Summing different indicators into one figure is meaningless
+    if not per_indicator and len(indicators) > 1:
+        errors.append(f"Choose a single indicator: {indicators}")
+    if not per_indicator and not indicators and len(vocabulary.indicator_codes) > 1:
+        errors.append(f"Data holds {len(vocabulary.indicator_codes)} indicators; choose one with 'indicator'")
+
+    # ---------- 10. STATISTICS (optional) ----------
+    statistics = config.get("statistics") or []
+    statistics = [statistics] if isinstance(statistics, str) else statistics
+
+    invalid_statistics = list(filter(lambda s: s not in STATISTICS, statistics))
+    if invalid_statistics:
+        errors.append(f"Invalid statistics: {invalid_statistics}. Choose from {STATISTICS}")
+
+    # ---------- 11. RETURN ----------
     if errors:
         return None, errors
 
@@ -87,7 +129,20 @@ def validate_json(config: dict, clean_df: pd.DataFrame):
         "output": output,
         "country": countries,
         "region": regions,
-        "year": years
+        "year": years,
+        "indicator": indicators,
+        "statistics": statistics
     }
 
     return validated, []
+
+
+def validate_many(configs: list, clean_df: pd.DataFrame = None, vocabulary: Vocabulary = None,
+                  per_indicator: bool = False) -> list:
+    """
+    validate_json for a batch of configs against one dataset. The
+    vocabulary is built (or looked up) once; returns one
+    (validated_config, errors) pair per config, in order.
+    """
+    vocabulary = vocabulary or vocabulary_of(clean_df)
+    return list(map(lambda config: validate_json(config, vocabulary=vocabulary, per_indicator=per_indicator), configs))
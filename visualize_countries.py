@@ -1,9 +1,14 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import pandas as pd
 from functools import reduce
 from itertools import cycle
-from matplotlib.widgets import Button
+from render import show_figure, render_chart
+from process import country_frames
+from memo import memoized
+from aggregate import AGGREGATIONS, STATISTICS, AggregateResult, group_statistics
+from profiler import profiled
 
 # ==================== PROFESSIONAL COLOR SCHEME ====================
 PROFESSIONAL_PALETTE = [
@@ -50,33 +55,42 @@ def configure_plot_style():
 
 def prepare_country_data(df, countries, operation):
     """Prepare aggregated data for each country using functional approach."""
-    aggregate_func = "sum" if operation == "sum" else "mean"
-    
-    return dict(
-        map(
-            lambda country: (
-                country,
-                df[df["Country Name"] == country]
-                .groupby("Year")["GDP"]
-                .agg(aggregate_func)
-                .reset_index()
-            ),
-            countries
-        )
-    )
+    return country_frames(df, countries, operation)
+
+def summarize_countries(country_data, statistics) -> AggregateResult:
+    """
+    Every requested statistic of each country's per-year GDP, from one
+    grouped pass over all countries, read by the summary and bar chart.
+    """
+    countries = list(country_data.keys())
+    frames = list(country_data.values())
+    values = pd.concat([frame["GDP"] for frame in frames], ignore_index=True) if frames else pd.Series(dtype=float)
+    keys = np.repeat(np.arange(len(frames)), list(map(len, frames)))
+
+    table = group_statistics(values, keys, statistics, "Country Name", np.array(countries, dtype=object)).table
+    # Countries without data: zero count and total, NaN for the rest
+    table = table.reindex(countries).fillna({stat: 0 for stat in ("count", "sum") if stat in table})
+    return AggregateResult(table)
+
+def summary_statistics(operation, statistics=None):
+    """The operation's statistic followed by any extra requested ones."""
+    extra = set(statistics or [])
+    return [AGGREGATIONS[operation]] + [stat for stat in STATISTICS if stat in extra and stat != AGGREGATIONS[operation]]
 
-def print_summary_stats(country_data, operation):
+def print_summary_stats(summary, operation):
     """Print country statistics using functional style."""
     print("\n" + "="*60)
     print("📊 COUNTRY GDP ANALYSIS SUMMARY".center(60))
     print("="*60)
     
+    extra = summary.statistics[1:]
     list(
         map(
-            lambda item: print(
-                f"\n{item[0]:>20} → {'Total GDP: $' + f'{item[1]['GDP'].sum():,.2f}' + 'T' if operation == 'sum' else 'Avg GDP: $' + f'{item[1]['GDP'].mean():,.2f}' + 'T'}"
+            lambda country: print(
+                f"\n{country:>20} → {'Total GDP: $' + f'{summary.value('sum', country):,.2f}' + 'T' if operation == 'sum' else 'Avg GDP: $' + f'{summary.value('mean', country):,.2f}' + 'T'}"
+                + "".join(map(lambda stat: f"\n{'':>20}   {stat}: {summary.value(stat, country):,.{0 if stat == 'count' else 2}f}", extra))
             ),
-            country_data.items()
+            summary.table.index
         )
     )
     print("\n" + "="*60 + "\n")
@@ -91,6 +105,7 @@ def maximize_window():
 
 # ==================== VISUALIZATION FUNCTIONS ====================
 
+@profiled
 def create_line_chart(country_data):
     """Create professional line chart with proper styling."""
     fig, ax = plt.subplots(figsize=(14, 7))
@@ -130,28 +145,19 @@ def create_line_chart(country_data):
     ax.grid(True, alpha=0.3, linestyle="--", linewidth=0.8)
     plt.tight_layout()
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, "countries-line", maximize_window)
 
-def create_bar_comparison(country_data, operation):
+@profiled
+def create_bar_comparison(country_data, operation, summary=None):
     """Create centered bar chart comparing countries."""
     fig, ax = plt.subplots(figsize=(12, 7))
     
-    # Calculate aggregate values
+    # Aggregate values, precomputed by summarize_countries
     countries = list(country_data.keys())
-    values = list(
-        map(
-            lambda item: item[1]["GDP"].sum() if operation == "sum" else item[1]["GDP"].mean(),
-            country_data.items()
-        )
-    )
+    if summary is None:
+        summary = summarize_countries(country_data, [AGGREGATIONS[operation]])
+    values = summary.values(AGGREGATIONS[operation], countries)
     
     # Create centered bar chart
     bars = ax.bar(
@@ -192,16 +198,10 @@ def create_bar_comparison(country_data, operation):
     
     plt.tight_layout()
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, "countries-bar", maximize_window)
 
+@profiled
 def create_area_chart(country_data):
     """Create stacked area chart for GDP trends."""
     fig, ax = plt.subplots(figsize=(14, 7))
@@ -241,16 +241,10 @@ def create_area_chart(country_data):
     ax.grid(True, alpha=0.3, linestyle="--", linewidth=0.8)
     plt.tight_layout()
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, "countries-area", maximize_window)
 
+@profiled
 def create_scatter_with_trend(country_data):
     """Create scatter plot with trend lines."""
     fig, ax = plt.subplots(figsize=(14, 7))
@@ -298,15 +292,8 @@ def create_scatter_with_trend(country_data):
     ax.grid(True, alpha=0.3, linestyle="--", linewidth=0.8)
     plt.tight_layout()
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, "countries-scatter", maximize_window)
 
 # ==================== MAIN VISUALIZATION FUNCTION ====================
 
@@ -324,14 +311,15 @@ def setup_style():
 # ==================== HELPER FUNCTIONS ====================
 def get_country_data(df, country, operation):
     """Get GDP data for one country"""
-    country_df = df[df["Country Name"] == country]
-    
-    if operation == "sum":
-        result = country_df.groupby("Year")["GDP"].sum().reset_index()
-    else:
-        result = country_df.groupby("Year")["GDP"].mean().reset_index()
+    def compute():
+        country_df = df[df["Country Name"] == country]
+        
+        if operation == "sum":
+            return country_df.groupby("Year")["GDP"].sum().reset_index()
+        return country_df.groupby("Year")["GDP"].mean().reset_index()
     
-    return result
+    # Same cache entry as prepare_country_data
+    return memoized(df, ("country", country, "sum" if operation == "sum" else "mean"), compute)
 
 def print_stats(country, data, operation):
     """Print stats for one country"""
@@ -343,6 +331,7 @@ def print_stats(country, data, operation):
         print(f"{country:>20} → Avg GDP: ${avg:,.2f}T")
 
 # ==================== CHART DRAWING FUNCTIONS ====================
+@profiled
 def draw_line_chart(ax, country_data_list, countries):
     """Draw line chart"""
     ax.clear()
@@ -358,6 +347,7 @@ def draw_line_chart(ax, country_data_list, countries):
     ax.legend(loc="upper left", fontsize=9, framealpha=0.9)
     ax.grid(True, alpha=0.3, linestyle="--")
 
+@profiled
 def draw_bar_chart(ax, country_data_list, countries, operation):
     """Draw bar chart"""
     ax.clear()
@@ -384,6 +374,7 @@ def draw_bar_chart(ax, country_data_list, countries, operation):
     plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     ax.grid(axis='y', alpha=0.3, linestyle="--")
 
+@profiled
 def draw_area_chart(ax, country_data_list, countries):
     """Draw area chart"""
     ax.clear()
@@ -401,6 +392,7 @@ def draw_area_chart(ax, country_data_list, countries):
     ax.legend(loc="upper left", fontsize=9, framealpha=0.9)
     ax.grid(True, alpha=0.3, linestyle="--")
 
+@profiled
 def draw_scatter_chart(ax, country_data_list, countries):
     """Draw scatter plot"""
     ax.clear()
@@ -424,10 +416,12 @@ def draw_scatter_chart(ax, country_data_list, countries):
     ax.grid(True, alpha=0.3, linestyle="--")
 
 # ==================== MAIN VISUALIZATION ====================
-def visualize_countries(df, config):
+def visualize_countries(df, config, country_data=None):
     """
     Main visualization function using functional programming style.
     Creates multiple professional, centered visualizations.
+    country_data: optional {country: per-year frame} from the query
+    planner, used instead of prepare_country_data(df, ...).
     """
     # Configure styling
     configure_plot_style()
@@ -437,10 +431,12 @@ def visualize_countries(df, config):
     operation = config["operation"]
     
     # Prepare data
-    country_data = prepare_country_data(df, countries, operation)
+    if country_data is None:
+        country_data = prepare_country_data(df, countries, operation)
     
-    # Print summary
-    print_summary_stats(country_data, operation)
+    # Summary statistics, computed once for the printout and bar chart
+    summary = summarize_countries(country_data, summary_statistics(operation, config.get("statistics")))
+    print_summary_stats(summary, operation)
     
     # Create all visualizations using functional composition
     visualizations = [
@@ -454,9 +450,9 @@ def visualize_countries(df, config):
     list(
         map(
             lambda viz_func: (
-                viz_func(country_data, operation) 
+                render_chart(viz_func, country_data, operation, summary) 
                 if viz_func == create_bar_comparison 
-                else viz_func(country_data)
+                else render_chart(viz_func, country_data)
             ),
             visualizations
         )
@@ -1,9 +1,17 @@
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Button
+from row_ranges import write_error_log
+
+# matplotlib is imported by the display functions only, so the text
+# report (print_errors) works without loading the plotting stack
+
+# Row ranges and example rows shown per error type in the report box
+MAX_RANGES = 6
+MAX_EXAMPLES = 5
 
 # ---------- STYLE ----------
 
 def set_modern_style():
+    import matplotlib.pyplot as plt
+
     plt.style.use("dark_background")
     plt.rcParams.update({
         "font.family": "sans-serif",
@@ -28,7 +36,9 @@ def format_json_errors(json_errors):
     return msg
 
 
-def format_csv_errors(csv_errors):
+def format_csv_errors(csv_errors, report_path=None):
+    # Counts and compressed row ranges; the full list only goes to report_path
+    # (written by write_report)
     msg = "⚠ CSV DATA ERRORS ⚠\n\n"
     has_error = False
 
@@ -36,7 +46,13 @@ def format_csv_errors(csv_errors):
         if rows:
             has_error = True
             name = error_type.replace("_", " ").title()
-            msg += f"{name} → {rows}\n\n"
+            msg += f"{name} → {len(rows)} rows: {rows.format(MAX_RANGES)}\n"
+            if len(rows.starts) > MAX_RANGES:
+                msg += f"first rows: {rows.head(MAX_EXAMPLES)}\n"
+            msg += "\n"
+
+    if has_error and report_path:
+        msg += f"Full list written to {report_path}\n"
 
     return msg if has_error else None
 
@@ -44,7 +60,9 @@ def format_csv_errors(csv_errors):
 # ---------- DISPLAY ----------
 
 def display_message(title, message, title_color="white",
-                    box_color="#2C3E50", text_color="white"):
+                    box_color="#2C3E50", text_color="white", name="errors"):
+    import matplotlib.pyplot as plt
+    from render import show_figure
 
     fig, ax = plt.subplots(figsize=(14, 8))
     fig.patch.set_facecolor("#1a1a1a")
@@ -79,32 +97,45 @@ def display_message(title, message, title_color="white",
     ax.axis("off")
     plt.subplots_adjust(left=0.1, right=0.95, top=0.88, bottom=0.18)
 
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn_next = Button(ax_button, "Next →", color="white", hovercolor="#E5E7EB")
-    btn_next.label.set_color("black")
-    btn_next.label.set_fontweight("bold")
+    def maximize():
+        mng = plt.get_current_fig_manager()
+        try:
+            mng.window.state("zoomed")
+        except Exception:
+            try:
+                mng.window.showMaximized()
+            except Exception:
+                pass
 
-    def next_screen(event):
-        plt.close(fig)
+    # Next button + window, or a file when headless
+    show_figure(fig, name, maximize)
 
-    btn_next.on_clicked(next_screen)
 
-    mng = plt.get_current_fig_manager()
-    try:
-        mng.window.state("zoomed")
-    except Exception:
-        try:
-            mng.window.showMaximized()
-        except Exception:
-            pass
+# ---------- TEXT REPORT ----------
+
+def write_report(csv_errors, report_path=None):
+    """The full list of flagged rows to report_path, whenever there are CSV errors."""
+    if report_path and any(csv_errors.values()):
+        write_error_log(csv_errors, report_path)
+
+
+def print_errors(csv_errors, json_errors, report_path=None):
+    """The same reports visualize_errors shows, printed to the terminal."""
+    # Written even when JSON errors replace the CSV report on screen
+    write_report(csv_errors, report_path)
+    if json_errors:
+        print(format_json_errors(json_errors))
+        return
 
-    plt.show()
+    msg = format_csv_errors(csv_errors, report_path)
+    print(msg if msg else "✔ No CSV errors found")
 
 
 # ---------- MAIN ENTRY ----------
 
-def visualize_errors(csv_errors, json_errors):
+def visualize_errors(csv_errors, json_errors, report_path=None):
     set_modern_style()
+    write_report(csv_errors, report_path)
 
     if json_errors:
         display_message(
@@ -112,11 +143,12 @@ def visualize_errors(csv_errors, json_errors):
             format_json_errors(json_errors),
             title_color="#FF4C4C",
             box_color="#FFFFFF",
-            text_color="#1a1a1a"
+            text_color="#1a1a1a",
+            name="errors-json"
         )
         return
 
-    msg = format_csv_errors(csv_errors)
+    msg = format_csv_errors(csv_errors, report_path)
 
     if msg:
         display_message(
@@ -124,7 +156,8 @@ def visualize_errors(csv_errors, json_errors):
             msg,
             title_color="#00CED1",
             box_color="#FFFFFF",
-            text_color="#1a1a1a"
+            text_color="#1a1a1a",
+            name="errors-csv"
         )
     else:
         print("✔ No CSV errors found")
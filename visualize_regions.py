@@ -1,9 +1,10 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from process import process
+from render import show_figure, render_chart
+from process import aggregate_table, table_frame
 from functools import reduce
-from matplotlib.widgets import Button
+from profiler import profiled
 
 # ==================== PROFESSIONAL COLOR SCHEME ====================
 PROFESSIONAL_PALETTE = [
@@ -56,6 +57,7 @@ def maximize_window():
         except:
             pass
 
+@profiled
 def create_bar_chart(region_gdp, focus_regions, year, operation):
     """Create professional bar chart for regions."""
     fig, ax = plt.subplots(figsize=(14, 8))
@@ -128,16 +130,10 @@ def create_bar_chart(region_gdp, focus_regions, year, operation):
     # Extra space at bottom and proper layout
     plt.subplots_adjust(left=0.1, right=0.95, top=0.92, bottom=0.18)
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, f"region-{year}-bar", maximize_window)
 
+@profiled
 def create_pie_chart(region_gdp, focus_regions, year, operation):
     """Create professional pie chart for regions."""
     fig, ax = plt.subplots(figsize=(12, 10))
@@ -208,16 +204,10 @@ def create_pie_chart(region_gdp, focus_regions, year, operation):
     # Proper spacing for pie chart with more top margin
     plt.subplots_adjust(left=0.05, right=0.95, top=0.88, bottom=0.05)
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, f"region-{year}-pie", maximize_window)
 
+@profiled
 def create_heatmap(region_gdp, focus_regions, year, operation):
     """Create professional heatmap for regions."""
     fig, ax = plt.subplots(figsize=(10, 8))
@@ -267,20 +257,15 @@ def create_heatmap(region_gdp, focus_regions, year, operation):
     
     plt.subplots_adjust(left=0.15, right=0.95, top=0.92, bottom=0.1)
     
-    # Add Next button
-    ax_button = plt.axes([0.02, 0.02, 0.1, 0.05])
-    btn = Button(ax_button, 'Next →', color='white', hovercolor='#E5E7EB')
-    btn.label.set_color('black')
-    btn.label.set_fontweight('bold')
-    btn.on_clicked(lambda event: plt.close())
-    
-    maximize_window()
-    plt.show()
+    # Next button + window, or a file when headless
+    show_figure(fig, f"region-{year}-heatmap", maximize_window)
 
-def visualize_regions(df, config):
+def visualize_regions(df, config, region_results=None):
     """
     Main visualization function for regions with professional styling.
     Uses pure functional programming style.
+    region_results: optional {year: per-continent frame} from the query
+    planner, used instead of slicing and aggregating df per year.
     """
     # Configure styling
     configure_plot_style()
@@ -293,10 +278,14 @@ def visualize_regions(df, config):
     print("📊 REGION GDP ANALYSIS".center(60))
     print("="*60)
 
+    # Every year's continent aggregate comes from one grouped reduction
+    if region_results is None:
+        table = aggregate_table(df, years, [operation])
+        region_results = dict(map(lambda year: (year, table_frame(table, operation, year)), years))
+
     # Process each year using map (functional style)
     def process_year(year):
-        year_df = df[df["Year"] == year]
-        region_gdp = process(year_df, config, "Continent").sort_values("GDP", ascending=False)
+        region_gdp = region_results[year].sort_values("GDP", ascending=False)
         
         # Terminal output
         print(f"\n{'Year: ' + str(year):^60}")
@@ -319,9 +308,9 @@ def visualize_regions(df, config):
         print("-" * 60)
         
         # Create visualizations
-        create_bar_chart(region_gdp, focus_regions, year, operation)
-        create_pie_chart(region_gdp, focus_regions, year, operation)
-        create_heatmap(region_gdp, focus_regions, year, operation)
+        render_chart(create_bar_chart, region_gdp, focus_regions, year, operation)
+        render_chart(create_pie_chart, region_gdp, focus_regions, year, operation)
+        render_chart(create_heatmap, region_gdp, focus_regions, year, operation)
     
     list(map(process_year, years))
 
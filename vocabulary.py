@@ -0,0 +1,118 @@
+import threading
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from memo import live_versions, version_of
+
+# Shortest similarity (Dice coefficient over trigrams) worth suggesting
+MIN_SIMILARITY = 0.4
+
+
+# ---------- N-GRAM INDEX ----------
+
+def trigrams(name: str) -> set:
+    padded = f"  {name.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NGramIndex:
+    """
+    Trigram -> names map for "did you mean" lookups. A query only scores
+    names sharing at least one trigram with it, not the whole vocabulary.
+    """
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.grams = [trigrams(name) for name in self.names]
+        self.postings = defaultdict(list)
+        for position, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(position)
+
+    def suggest(self, query: str, limit: int = 3) -> list:
+        """Most similar names to query, best first."""
+        grams = trigrams(query)
+        shared = Counter(position for gram in grams for position in self.postings.get(gram, ()))
+        scored = [
+            (2 * count / (len(grams) + len(self.grams[position])), self.names[position])
+            for position, count in shared.items()
+        ]
+        scored = sorted(filter(lambda item: item[0] >= MIN_SIMILARITY, scored), key=lambda item: -item[0])
+        return [name for _, name in scored[:limit]]
+
+
+# ---------- VOCABULARY ----------
+
+class Vocabulary:
+    """
+    Countries, regions, years and indicators a config may refer to, built
+    once per dataset and shared by every validate_json call against it.
+    indicators holds codes and names; indicator_codes the distinct codes.
+    """
+
+    def __init__(self, countries, regions, years, indicators=(), indicator_codes=()):
+        self.countries = set(countries)
+        self.regions = set(regions)
+        self.years = set(years)
+        self.indicators = set(indicators)
+        self.indicator_codes = set(indicator_codes)
+        self.indexes = {}
+
+    @classmethod
+    def from_frame(cls, clean_df: pd.DataFrame, year_cols=None):
+        """Vocabulary of a cleaned (wide) frame; year_cols defaults to its own columns."""
+        def distinct(col):
+            # Text columns are categorical: unique() only walks the codes
+            if col not in clean_df:
+                return set()
+            return {str(value).strip() for value in clean_df[col].dropna().unique()}
+
+        year_cols = clean_df.columns if year_cols is None else year_cols
+        codes = distinct("Indicator Code")
+        return cls(
+            distinct("Country Name"),
+            distinct("Continent"),
+            {int(col) for col in year_cols if col.isdigit()},
+            codes | distinct("Indicator Name"),
+            codes
+        )
+
+    def union(self, other):
+        return Vocabulary(
+            self.countries | other.countries, self.regions | other.regions,
+            self.years | other.years, self.indicators | other.indicators,
+            self.indicator_codes | other.indicator_codes
+        )
+
+    def suggest(self, kind: str, name: str, limit: int = 3) -> list:
+        """Closest known countries / regions to name, from a trigram index built on first use."""
+        if kind not in self.indexes:
+            self.indexes[kind] = NGramIndex(getattr(self, kind))
+        return self.indexes[kind].suggest(str(name), limit)
+
+
+# version -> Vocabulary, apart from RESULTS: its byte size is not what
+# RESULTS measures, and aggregation traffic must not evict it
+_vocabularies = {}
+_vocabularies_lock = threading.Lock()
+
+
+def vocabulary_of(clean_df: pd.DataFrame) -> Vocabulary:
+    """
+    The frame's Vocabulary, built once per data version (and on every call
+    for untagged data). It is kept while data of that version is alive.
+    """
+    version = version_of(clean_df)
+    if version is None:
+        return Vocabulary.from_frame(clean_df)
+
+    with _vocabularies_lock:
+        vocabulary = _vocabularies.get(version)
+    if vocabulary is None:
+        vocabulary = Vocabulary.from_frame(clean_df)
+        with _vocabularies_lock:
+            vocabulary = _vocabularies.setdefault(version, vocabulary)
+            for stale in set(_vocabularies) - live_versions():
+                del _vocabularies[stale]
+    return vocabulary